@@ -2,22 +2,10 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from google.adk.agents import Agent, SequentialAgent, ParallelAgent
-from google.adk.models.googlellm import Gemini
-from google.genai import types
-from google.adk.tools.agenttool import AgentTool
 import json
+import threading
 
-retry_config = types.HttpRetryOptions(
-    attempts=3,
-    httpstatuscodes=[429, 500, 503, 504]
-)
-
-# ===== SKILL ANALYZER AGENT =====
-skill_analyzer = Agent(
-    name="SkillAnalyzerAgent",
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
-    instruction="""Analyze job for skills match.
+SKILL_ANALYZER_INSTRUCTION = """Analyze job for skills match.
     Job Description: {job_description}
     Job Title: {job_title}
     User Skills: {user_skills}
@@ -31,15 +19,9 @@ skill_analyzer = Agent(
         "missing_skills": ["skill2"],
         "learnable_1_week": "Mixed",
         "experience_match": "Yes"
-    }""",
-    output_key="skills_analysis"
-)
+    }"""
 
-# ===== JOB RANKER AGENT =====
-job_ranker = Agent(
-    name="JobRankerAgent",
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
-    instruction="""Rank job opportunity.
+JOB_RANKER_INSTRUCTION = """Rank job opportunity.
     Skills Analysis: {skills_analysis}
     Location: {location}
     Remote Type: {remote_type}
@@ -53,15 +35,9 @@ job_ranker = Agent(
         "match_score": 85,
         "priority_level": "High",
         "rationale": "explanation"
-    }""",
-    output_key="job_ranking"
-)
+    }"""
 
-# ===== COMPANY RESEARCHER AGENT =====
-company_researcher = Agent(
-    name="CompanyResearcherAgent",
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
-    instruction="""Research company intelligence.
+COMPANY_RESEARCHER_INSTRUCTION = """Research company intelligence.
     Company Name: {company_name}
     Company URL: {company_url}
     
@@ -74,26 +50,86 @@ company_researcher = Agent(
         "recent_projects": ["Project A"],
         "employee_count": "500",
         "company_email": "hr@company.com"
-    }""",
-    output_key="company_intel"
-)
+    }"""
 
-# ===== PARALLEL: Skills + Company Research (Independent) =====
-parallel_analysis = ParallelAgent(
-    name="ParallelAnalysis",
-    sub_agents=[
-        AgentTool(skill_analyzer),
-        AgentTool(company_researcher)
-    ]
-)
+_agents = None
+_agents_lock = threading.Lock()
 
-# ===== SEQUENTIAL: Full Pipeline (Dependent) =====
-job_processing_pipeline = SequentialAgent(
-    name="JobProcessingPipeline",
-    sub_agents=[
-        AgentTool(parallel_analysis),
-        AgentTool(job_ranker)
-    ]
-)
+def build_agents() -> dict:
+    """Create the ADK agent graph once; google.adk is only imported here."""
+    global _agents
+    with _agents_lock:
+        if _agents is not None:
+            return _agents
+        
+        from google.adk.agents import Agent, SequentialAgent, ParallelAgent
+        from google.adk.models.googlellm import Gemini
+        from google.genai import types
+        from google.adk.tools.agenttool import AgentTool
+        
+        retry_config = types.HttpRetryOptions(
+            attempts=3,
+            httpstatuscodes=[429, 500, 503, 504]
+        )
+        
+        # ===== SKILL ANALYZER AGENT =====
+        skill_analyzer = Agent(
+            name="SkillAnalyzerAgent",
+            model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
+            instruction=SKILL_ANALYZER_INSTRUCTION,
+            output_key="skills_analysis"
+        )
+        
+        # ===== JOB RANKER AGENT =====
+        job_ranker = Agent(
+            name="JobRankerAgent",
+            model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
+            instruction=JOB_RANKER_INSTRUCTION,
+            output_key="job_ranking"
+        )
+        
+        # ===== COMPANY RESEARCHER AGENT =====
+        company_researcher = Agent(
+            name="CompanyResearcherAgent",
+            model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
+            instruction=COMPANY_RESEARCHER_INSTRUCTION,
+            output_key="company_intel"
+        )
+        
+        # ===== PARALLEL: Skills + Company Research (Independent) =====
+        parallel_analysis = ParallelAgent(
+            name="ParallelAnalysis",
+            sub_agents=[
+                AgentTool(skill_analyzer),
+                AgentTool(company_researcher)
+            ]
+        )
+        
+        # ===== SEQUENTIAL: Full Pipeline (Dependent) =====
+        job_processing_pipeline = SequentialAgent(
+            name="JobProcessingPipeline",
+            sub_agents=[
+                AgentTool(parallel_analysis),
+                AgentTool(job_ranker)
+            ]
+        )
+        
+        _agents = {
+            "retry_config": retry_config,
+            "skill_analyzer": skill_analyzer,
+            "job_ranker": job_ranker,
+            "company_researcher": company_researcher,
+            "parallel_analysis": parallel_analysis,
+            "job_processing_pipeline": job_processing_pipeline,
+        }
+        print("✅ ADK Agents created (Parallel + Sequential)")
+        return _agents
 
-print("✅ ADK Agents created (Parallel + Sequential)")
+def __getattr__(name: str):
+    # `from agents.adk_agents import job_ranker` keeps working; built on first access
+    if name.startswith("__"):
+        raise AttributeError(name)
+    agents = build_agents()
+    if name in agents:
+        return agents[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,32 +1,75 @@
 """
 Company Research - MISSION, CULTURE, TECH STACK
+Results are kept per canonical company name so repeat employers skip the LLM
 """
-import google.generativeai as genai
-from config.config import GEMINI_API_KEY
+from agents.gemini_client import client
+from agents.description_preprocessor import prepare_description, COMPANY_TOKENS
+from config.config import COMPANY_INTEL_TTL
+from utils.local_db import connect
+from utils.lazy import LazyProxy
+from typing import Dict, Optional
 import json
 import re
+import threading
+import time
 
-genai.configure(api_key=GEMINI_API_KEY)
+UNKNOWN_COMPANIES = {'', 'unknown', 'n/a'}
 
-def research_company(job: dict) -> dict:
-    """Extract company mission, culture, tech stack."""
-    try:
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
-        
-        company_name = job.get('Company Name', 'Unknown')
-        job_desc = job.get('Job Description', '')[:1500]
-        
-        if not job_desc:
-            return {
-                'Company Mission': 'N/A',
-                'Company Values': 'N/A',
-                'Company Culture Keywords': 'N/A',
-                'Tech Stack Used': 'N/A'
-            }
-        
-        print("   ⚙️ Extracting company info...")
-        
-        response = model.generate_content(f"""From this job posting for {company_name}, extract:
+INTEL_FIELDS = ['Company Mission', 'Company Values', 'Company Culture Keywords', 'Tech Stack Used']
+
+EMPTY_INTEL = {field: 'N/A' for field in INTEL_FIELDS}
+
+# Trailing legal forms: "Siemens AG", "SAP SE", "Zalando SE & Co. KG", "Acme GmbH & Co. KG"
+LEGAL_SUFFIX_RE = re.compile(
+    r'(?:[\s,]+(?:gmbh|ag|se|kg|kgaa|ug|ohg|gbr|e\.?\s?v\.?|mbh|co\.?|&|und|haftungsbeschränkt|\(haftungsbeschränkt\)|'
+    r'inc\.?|ltd\.?|llc|plc|corp\.?|corporation|b\.?v\.?|n\.?v\.?|s\.?a\.?|s\.?a\.?r\.?l\.?|s\.?r\.?l\.?|group|holding))+$',
+    re.IGNORECASE,
+)
+
+def canonical_company_name(name: str) -> str:
+    """'SAP SE' / 'sap' / 'SAP Deutschland SE & Co. KG' -> 'sap' / 'sap' / 'sap deutschland'."""
+    name = re.sub(r'\s+', ' ', str(name or '')).strip().lower()
+    canonical = LEGAL_SUFFIX_RE.sub('', name).strip(' ,.-')
+    return canonical or name
+
+class CompanyIntelStore:
+    def __init__(self, name: str = "company_intel", ttl: int = COMPANY_INTEL_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.conn = connect(name)
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS companies (
+            key TEXT PRIMARY KEY,
+            company_name TEXT NOT NULL,
+            intel TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        )""")
+
+    def get(self, company_name: str) -> Optional[Dict[str, str]]:
+        """Fresh intel for this company, or None."""
+        key = canonical_company_name(company_name)
+        if key in UNKNOWN_COMPANIES:
+            return None
+        with self.lock:
+            row = self.conn.execute("SELECT intel, updated_at FROM companies WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row['updated_at'] > self.ttl:
+            return None
+        return json.loads(row['intel'])
+
+    def put(self, company_name: str, intel: Dict[str, str]):
+        key = canonical_company_name(company_name)
+        if key in UNKNOWN_COMPANIES or all(intel.get(f, 'N/A') == 'N/A' for f in INTEL_FIELDS):
+            return
+        data = {f: intel.get(f, 'N/A') for f in INTEL_FIELDS}
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO companies (key, company_name, intel, updated_at) VALUES (?, ?, ?, ?)",
+                (key, company_name, json.dumps(data), time.time()),
+            )
+
+company_store = LazyProxy(CompanyIntelStore)
+
+def build_company_prompt(company_name: str, job_desc: str) -> str:
+    return f"""From this job posting for {company_name}, extract:
 - Company mission (1 sentence, what they do)
 - Company values (2-3 key words)
 - Culture keywords (startup/remote/corporate/etc)
@@ -38,31 +81,59 @@ Values: ...
 Culture: ...
 Tech: ...
 
-Job: {job_desc}""")
-        
-        response_text = response.text.strip()
-        print(f"   Response: {response_text[:100]}...")
-        
-        # Parse response
-        company_data = {
-            'Company Mission': extract_field(response_text, 'Mission'),
-            'Company Values': extract_field(response_text, 'Values'),
-            'Company Culture Keywords': extract_field(response_text, 'Culture'),
-            'Tech Stack Used': extract_field(response_text, 'Tech')
-        }
-        
-        print(f"   ✅ Extracted company data\n")
-        
-        return company_data
-        
+Job: {job_desc}"""
+
+def parse_company_response(response_text: str) -> Dict[str, str]:
+    return {
+        'Company Mission': extract_field(response_text, 'Mission'),
+        'Company Values': extract_field(response_text, 'Values'),
+        'Company Culture Keywords': extract_field(response_text, 'Culture'),
+        'Tech Stack Used': extract_field(response_text, 'Tech')
+    }
+
+def _company_prompt(job: dict):
+    """(company name, cached/empty intel, prompt); the prompt is None when no LLM call is needed."""
+    company_name = job.get('Company Name', 'Unknown')
+    cached = company_store.get(company_name)
+    if cached:
+        print(f"   ♻️ Company intel cached for {company_name}")
+        return company_name, cached, None
+    if not job.get('Job Description'):
+        return company_name, dict(EMPTY_INTEL), None
+    job_desc = prepare_description(job, COMPANY_TOKENS, 'company')
+    print("   ⚙️ Extracting company info...")
+    return company_name, None, build_company_prompt(company_name, job_desc)
+
+def _store_company(company_name: str, response_text: str) -> dict:
+    print(f"   Response: {response_text[:100]}...")
+    company_data = parse_company_response(response_text)
+    company_store.put(company_name, company_data)
+    print(f"   ✅ Extracted company data\n")
+    return company_data
+
+def research_company(job: dict) -> dict:
+    """Extract company mission, culture, tech stack."""
+    try:
+        company_name, intel, prompt = _company_prompt(job)
+        if prompt is None:
+            return intel
+        response_text = client.generate_content(prompt, generation_config=None, raise_errors=True)
+        return _store_company(company_name, response_text)
+    except Exception as e:
+        print(f"   ❌ Company error: {e}")
+        return dict(EMPTY_INTEL)
+
+async def research_company_async(job: dict) -> dict:
+    """research_company for the asyncio pipeline (same store, prompt and fallbacks)."""
+    try:
+        company_name, intel, prompt = _company_prompt(job)
+        if prompt is None:
+            return intel
+        response_text = await client.generate_content_async(prompt, generation_config=None)
+        return _store_company(company_name, response_text)
     except Exception as e:
         print(f"   ❌ Company error: {e}")
-        return {
-            'Company Mission': 'N/A',
-            'Company Values': 'N/A',
-            'Company Culture Keywords': 'N/A',
-            'Tech Stack Used': 'N/A'
-        }
+        return dict(EMPTY_INTEL)
 
 def extract_field(text: str, field_name: str) -> str:
     """Extract field value from response text."""
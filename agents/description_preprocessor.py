@@ -0,0 +1,186 @@
+"""
+Description Preprocessor - SHRINK LLM INPUT
+Segments a job description, drops DE/EN boilerplate (equal-opportunity text,
+cookie/privacy banners, "apply now" blurbs), removes repeated sentences and
+packs the most useful sections first into a token budget.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))  # Project root
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from agents.gemini_client import estimate_tokens
+from agents.skill_dictionary import extract_skills
+
+# Budgets replacing the old [:300] / [:1500] / [:3000] character slices (~4 chars per token)
+SKILL_TOKENS = 750
+COMPANY_TOKENS = 375
+SKILL_HINT_TOKENS = 75  # short "Analyze required skills" prompt in main
+
+# Section headers -> section. Checked on short segments only.
+SECTION_HEADERS = [
+    ('requirements', r'requirements|qualifications|your profile|what you bring|what we.re looking for|must.have|'
+                     r'nice.to.have|skills|dein profil|ihr profil|anforderungen|das bringst du mit|was du mitbringst|'
+                     r'was sie mitbringen|qualifikation'),
+    ('tasks', r'responsibilities|your (?:tasks|role|mission)|what you.ll do|the role|aufgaben|deine aufgaben|'
+              r'ihre aufgaben|das erwartet dich|dein job|tätigkeiten'),
+    ('about', r'about us|who we are|the company|our mission|über uns|wer wir sind|unternehmen|das sind wir'),
+    ('benefits', r'benefits|what we offer|perks|was wir bieten|wir bieten|das bieten wir|unser angebot|deine vorteile|ihre vorteile'),
+]
+# A segment is a header when it is just the header words (optionally after a possessive or
+# article: "Ihr Profil", "Your tasks") or when the header words are followed by a colon
+# ("Skills: Python, AWS" switches section and keeps its content).
+HEADER_PREFIX = r'^\W*(?:(?:your|our|the|dein|deine|ihr|ihre|unser|unsere|das|die|der)\s+)?'
+SECTION_HEADER_RE = [(section, re.compile(rf'{HEADER_PREFIX}(?:{pattern})\s*(:?)\s*', re.IGNORECASE))
+                     for section, pattern in SECTION_HEADERS]
+HEADER_MAX_CHARS = 60
+
+# Never useful to the LLM, wherever they appear. Whole phrases only, so requirements such as
+# "Kenntnisse im Datenschutz (DSGVO)" survive.
+BOILERPLATE_RE = re.compile(
+    r'equal opportunit(?:y|ies) employer|regardless of (?:race|gender|age|religion|sexual)|'
+    r'we (?:celebrate|value|embrace) diversity|all qualified applicants|'
+    r'(?:stehen für|fördern|leben) (?:chancengleichheit|vielfalt)|'
+    r'unabhängig von (?:geschlecht|alter|herkunft|nationalität|religion)|bei gleicher eignung|'
+    r'(?:we|this (?:site|website)) uses? cookies|accept (?:all )?cookies|cookie[- ](?:settings|policy|preferences)|'
+    r'wir verwenden cookies|diese (?:website|seite) (?:verwendet|nutzt) cookies|alle (?:cookies )?akzeptieren|'
+    r'our privacy (?:policy|notice)|datenschutzerklärung|datenschutzhinweise|'
+    r'enable javascript|javascript (?:aktivieren|ist deaktiviert)|'
+    r'apply now|click (?:here|apply) to apply|send (?:us )?your (?:cv|resume|application)|'
+    r'jetzt bewerben|bewirb dich (?:jetzt|gleich|online)|wir freuen uns auf (?:deine|ihre) (?:bewerbung|aussagekräftige)|'
+    r'(?:sende|senden sie) uns (?:deine|ihre) (?:vollständigen )?bewerbungsunterlagen',
+    re.IGNORECASE,
+)
+
+REQUIREMENT_HINT_RE = re.compile(
+    r'experience|knowledge|degree|proficien|familiar|years|fluent|erfahrung|kenntnisse|studium|ausbildung|'
+    r'sicher im umgang|fließend|jahre',
+    re.IGNORECASE,
+)
+
+# Section order per prompt purpose; sections missing from a focus are dropped
+FOCUS_ORDER = {
+    'skills': ['requirements', 'tasks', 'other'],
+    'company': ['about', 'requirements', 'tasks', 'other', 'benefits'],
+    'full': ['requirements', 'tasks', 'other', 'about', 'benefits'],
+}
+
+# Stripped block tags leave headers glued to their neighbours ("Anfragen.Dein ProfilDu hast ...")
+# (case-sensitive lookahead, so compounds like "Unternehmenskultur" stay whole)
+GLUED_HEADER_RE = re.compile(rf'\b({"|".join(p for _, p in SECTION_HEADERS)})(?=(?-i:[A-ZÄÖÜ0-9]))', re.IGNORECASE)
+GLUED_SENTENCE_RE = re.compile(r'(?<=[a-zäöüß)][.!?])(?=[A-ZÄÖÜ][a-zäöüß])')
+SEGMENT_SPLIT_RE = re.compile(r'\s*(?:\n+|(?<=[.!?])\s+(?=[A-ZÄÖÜ"„(])|\s[•·▪●◦]\s*|\s[-*]\s+(?=[A-ZÄÖÜa-zäöü]))\s*')
+BULLET_RE = re.compile(r'^(?:[\s•·▪●◦\-*]+|\d{1,2}[.)]\s+)+')
+
+_totals = {'jobs': 0, 'raw_tokens': 0, 'sent_tokens': 0}
+_totals_lock = threading.Lock()
+_logged: "OrderedDict[str, None]" = OrderedDict()  # job ids already reported, oldest first
+LOGGED_MAX_IDS = 2048
+
+def segment(text: str) -> List[str]:
+    """Lines, bullets and sentences, with bullet markers removed."""
+    text = GLUED_SENTENCE_RE.sub('\n', text or '')
+    text = GLUED_HEADER_RE.sub(lambda m: f"\n{m.group(1)}\n" if m.group(1)[0].isupper() else m.group(1), text)
+    segments = []
+    for piece in SEGMENT_SPLIT_RE.split(text):
+        piece = BULLET_RE.sub('', piece).strip()
+        if piece:
+            segments.append(piece)
+    return segments
+
+def _header_section(seg: str) -> Tuple[Optional[str], str]:
+    """(section, remaining content) for 'Dein Profil' or 'Skills: Python, AWS'; (None, seg) otherwise."""
+    if len(seg) > HEADER_MAX_CHARS:
+        return None, seg
+    for section, pattern in SECTION_HEADER_RE:
+        match = pattern.match(seg)
+        if not match:
+            continue
+        if match.end() == len(seg):
+            return section, ''
+        if match.group(1):
+            return section, seg
+    return None, seg
+
+def _norm(seg: str) -> str:
+    return re.sub(r'\W+', ' ', seg.lower()).strip()
+
+def classify(text: str) -> Dict[str, List[str]]:
+    """Section -> segments in original order, boilerplate and repeats removed."""
+    sections = {name: [] for name in ('requirements', 'tasks', 'about', 'benefits', 'other')}
+    current = None
+    seen = set()
+    for seg in segment(text):
+        header, seg = _header_section(seg)
+        if header:
+            current = header
+            if not seg:
+                continue
+        if BOILERPLATE_RE.search(seg):
+            continue
+        key = _norm(seg)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        section = current
+        if section is None:
+            section = 'requirements' if (REQUIREMENT_HINT_RE.search(seg) or extract_skills(seg)) else 'other'
+        sections[section].append(seg)
+    return sections
+
+def preprocess_description(text: str, max_tokens: int = SKILL_TOKENS, focus: str = 'full') -> Tuple[str, Dict[str, int]]:
+    """Condensed description within max_tokens plus {'raw_tokens', 'sent_tokens', 'saved_tokens'}."""
+    raw_tokens = estimate_tokens(text or '')
+    sections = classify(text)
+    parts, used = [], 0
+    for section in FOCUS_ORDER.get(focus, FOCUS_ORDER['full']):
+        for seg in sections[section]:
+            cost = estimate_tokens(seg) + 1
+            if used + cost > max_tokens:
+                if not parts:  # one huge segment: keep what fits
+                    parts.append(seg[:max_tokens * 4])
+                    used = max_tokens
+                break
+            parts.append(seg)
+            used += cost
+        if used >= max_tokens:
+            break
+    condensed = "\n".join(parts)
+    if not condensed:  # nothing recognisable survived; fall back to the old slice
+        condensed = (text or '')[:max_tokens * 4]
+    sent_tokens = estimate_tokens(condensed)
+    stats = {'raw_tokens': raw_tokens, 'sent_tokens': sent_tokens, 'saved_tokens': max(raw_tokens - sent_tokens, 0)}
+    with _totals_lock:
+        _totals['jobs'] += 1
+        _totals['raw_tokens'] += raw_tokens
+        _totals['sent_tokens'] += sent_tokens
+    return condensed, stats
+
+def _first_report(job_id: str) -> bool:
+    if not job_id:
+        return True
+    with _totals_lock:
+        if job_id in _logged:
+            return False
+        _logged[job_id] = None
+        while len(_logged) > LOGGED_MAX_IDS:
+            _logged.popitem(last=False)
+    return True
+
+def prepare_description(job: Dict, max_tokens: int = SKILL_TOKENS, focus: str = 'full') -> str:
+    """Condensed 'Job Description' for a prompt; logs the tokens saved once per job."""
+    condensed, stats = preprocess_description(job.get('Job Description', ''), max_tokens, focus)
+    if stats['raw_tokens'] and _first_report(job.get('Job ID', '')):
+        print(f"   ✂️ Description {job.get('Job ID', '')}: {stats['raw_tokens']} -> {stats['sent_tokens']} tokens "
+              f"(saved {stats['saved_tokens']})")
+    return condensed
+
+def preprocess_stats() -> Dict[str, int]:
+    with _totals_lock:
+        totals = dict(_totals)
+    totals['saved_tokens'] = totals['raw_tokens'] - totals['sent_tokens']
+    return totals
@@ -2,34 +2,219 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))  # Project root
 
-import google.generativeai as genai
+import asyncio
+import random
+import threading
 import time
 import json
-from config.config import GEMINI_API_KEY  # Now works
-from typing import Dict, Any, List
+import weakref
+from collections import deque
+from config.config import (GEMINI_API_KEY, GEMINI_MODEL, LLM_CACHE_ENABLED,  # Now works
+                           GEMINI_MAX_CONCURRENCY, GEMINI_RPM, GEMINI_TPM)
+from agents.llm_cache import LLMCache
+from utils.lazy import LazyProxy
+from typing import Dict, Any, List, Optional
+
+DEFAULT_GENERATION_CONFIG = {"temperature": 0.1}
+EXPECTED_OUTPUT_TOKENS = 300  # reserved per call until the real usage is known
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+def estimate_tokens(text: str) -> int:
+    """Rough Gemini token count (~4 chars per token)."""
+    return len(text) // 4 + 1
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter so parallel callers don't retry in lockstep."""
+    return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+# Sync callers run on worker threads (enrich_jobs pool, webhook command workers), so
+# their in-flight cap is process-wide rather than per event loop.
+_sync_slots = threading.BoundedSemaphore(GEMINI_MAX_CONCURRENCY)
+
+_configured = False
+_configure_lock = threading.Lock()
+
+def configure_gemini():
+    """The one place genai is imported and configured; safe to call repeatedly."""
+    global _configured
+    import google.generativeai as genai  # deferred: heavy import
+    
+    with _configure_lock:
+        if not _configured:
+            if not GEMINI_API_KEY:
+                raise ValueError("GEMINI_API_KEY missing in .env")
+            genai.configure(api_key=GEMINI_API_KEY)
+            _configured = True
+    return genai
+
+class RateScheduler:
+    """Sliding 60s window over requests and tokens, shared by sync and async callers."""
+
+    WINDOW = 60.0
+
+    def __init__(self, rpm: int = GEMINI_RPM, tpm: int = GEMINI_TPM):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.events = deque()  # [timestamp, tokens]
+        self.window_tokens = 0
+        self.lock = threading.Lock()
+
+    def _expire(self, now: float):
+        while self.events and now - self.events[0][0] >= self.WINDOW:
+            self.window_tokens -= self.events.popleft()[1]
+
+    def reserve(self, tokens: int):
+        """Book a request now if the window allows it.
+
+        Returns (event, 0) on success or (None, seconds to wait).
+        """
+        with self.lock:
+            now = time.monotonic()
+            self._expire(now)
+            fits_tokens = self.window_tokens + tokens <= self.tpm or not self.events
+            if len(self.events) < self.rpm and fits_tokens:
+                event = [now, tokens]
+                self.events.append(event)
+                self.window_tokens += tokens
+                return event, 0.0
+
+            wait_time = 0.0
+            if len(self.events) >= self.rpm:
+                wait_time = self.events[len(self.events) - self.rpm][0] + self.WINDOW - now
+            if not fits_tokens:
+                freed = 0
+                for ts, used in self.events:
+                    freed += used
+                    if self.window_tokens - freed + tokens <= self.tpm:
+                        wait_time = max(wait_time, ts + self.WINDOW - now)
+                        break
+            return None, max(wait_time, 0.01)
+
+    def acquire(self, tokens: int):
+        while True:
+            event, wait_time = self.reserve(tokens)
+            if event:
+                return event
+            time.sleep(wait_time)
+
+    async def acquire_async(self, tokens: int):
+        while True:
+            event, wait_time = self.reserve(tokens)
+            if event:
+                return event
+            await asyncio.sleep(wait_time)
+
+    def settle(self, event, actual_tokens: int):
+        """Replace the estimate with the token count the API reported."""
+        with self.lock:
+            if event in self.events:
+                self.window_tokens += actual_tokens - event[1]
+            event[1] = actual_tokens
 
 class GeminiClient:
-    def __init__(self):
-        if not GEMINI_API_KEY:
-            raise ValueError("GEMINI_API_KEY missing in .env")
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.5-flash-lite')  # Or 'gemini-1.5-flash' for speed
-
-    def generate_content(self, prompt: str, system_instruction: str = "", max_retries: int = 3) -> str:
-        """Robust content generation with retries."""
+    def __init__(self, model_name: str = GEMINI_MODEL):
+        genai = configure_gemini()
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)  # Or 'gemini-1.5-flash' for speed
+        self.cache = LLMCache() if LLM_CACHE_ENABLED else None
+        self.scheduler = RateScheduler()
+        self.max_concurrency = GEMINI_MAX_CONCURRENCY
+        # One per event loop. Weak keys let a dead loop go; a semaphore that had waiters
+        # references its loop, so closed loops are also pruned on the next lookup.
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        sem = self._semaphores.get(loop)
+        if sem is None:
+            for closed in [l for l in list(self._semaphores.keys()) if l.is_closed()]:
+                self._semaphores.pop(closed, None)
+            sem = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return sem
+
+    @staticmethod
+    def _usage_tokens(response, fallback: int) -> int:
+        try:
+            return response.usage_metadata.total_token_count or fallback
+        except Exception:
+            return fallback
+
+    def _cache_key(self, prompt: str, generation_config: Optional[Dict[str, Any]]) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.make_key(self.model_name, generation_config, prompt)
+
+    def generate_content(self, prompt: str, system_instruction: str = "", max_retries: int = 3,
+                         generation_config: Optional[Dict[str, Any]] = DEFAULT_GENERATION_CONFIG,
+                         use_cache: bool = True, raise_errors: bool = False) -> str:
+        """Robust content generation with retries.
+
+        Responses are cached by (model, generation_config, prompt). With
+        raise_errors the last exception is raised instead of returning
+        an "Error: ..." string.
+        """
         full_prompt = f"{system_instruction}\n\nUser: {prompt}" if system_instruction else prompt
+        key = self._cache_key(full_prompt, generation_config) if use_cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        estimate = estimate_tokens(full_prompt) + EXPECTED_OUTPUT_TOKENS
         for attempt in range(max_retries):
             try:
-                response = self.model.generate_content(full_prompt, generation_config={"temperature": 0.1})
+                with _sync_slots:
+                    event = self.scheduler.acquire(estimate)
+                    response = self.model.generate_content(full_prompt, generation_config=generation_config)
+                self.scheduler.settle(event, self._usage_tokens(response, estimate))
                 if response.text:
-                    return response.text.strip()
+                    text = response.text.strip()
+                    if key:
+                        self.cache.put(key, text)
+                    return text
                 else:
                     raise ValueError("Empty response")
             except Exception as e:
                 print(f"Gemini attempt {attempt+1} failed: {e}")
                 if attempt == max_retries - 1:
+                    if raise_errors:
+                        raise
                     return f"Error: {str(e)}"  # Graceful fallback
-                time.sleep(2 ** attempt)  # Exponential backoff
+                time.sleep(retry_delay(attempt))  # Exponential backoff
+
+    async def generate_content_async(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                                     use_cache: bool = True, max_retries: int = 3) -> str:
+        """Non-blocking generation shared by all agents.
+
+        At most max_concurrency calls are in flight per event loop, each call
+        waits for room in the RPM/TPM window, and retries back off with
+        asyncio.sleep. Errors are raised after the last attempt.
+        """
+        key = self._cache_key(prompt, generation_config) if use_cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        estimate = estimate_tokens(prompt) + EXPECTED_OUTPUT_TOKENS
+        async with self._semaphore():
+            for attempt in range(max_retries):
+                try:
+                    event = await self.scheduler.acquire_async(estimate)
+                    response = await self.model.generate_content_async(prompt, generation_config=generation_config)
+                    self.scheduler.settle(event, self._usage_tokens(response, estimate))
+                    text = response.text.strip()
+                    if not text:
+                        raise ValueError("Empty response")
+                    if key:
+                        self.cache.put(key, text)
+                    return text
+                except Exception as e:
+                    print(f"Gemini async attempt {attempt+1} failed: {e}")
+                    if attempt == max_retries - 1:
+                        raise
+                    await asyncio.sleep(retry_delay(attempt))
 
     def generate_structured(self, prompt: str, schema: Dict[str, Any]) -> Dict[str, Any]:
         """JSON mode for structured output (e.g., skills list)."""
@@ -40,14 +225,18 @@ class GeminiClient:
         except json.JSONDecodeError:
             return {"error": "Invalid JSON", "raw": response}
 
-# Singleton instance
-client = GeminiClient()
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.cache.stats() if self.cache else {}
+
+# Singleton instance - built on first use
+client = LazyProxy(GeminiClient)
 
 def test_client():
     """Test function."""
     result = client.generate_content("Say 'Gemini ready!'")
     print(result)
     print("Gemini ready")
+    print(f"Cache: {client.cache_stats()}")
 
 if __name__ == "__main__":
     test_client()
@@ -0,0 +1,183 @@
+"""
+Job Enricher - ONE FUSED GEMINI CALL PER JOB
+Skills, company intel, red/green flags and salary hint from a single
+schema-constrained prompt, mapped straight onto the Sheets COLUMNS
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))  # Project root
+
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from agents.gemini_client import client
+from config.config import GEMINI_MAX_CONCURRENCY
+from agents.company_researcher import company_store, EMPTY_INTEL, INTEL_FIELDS
+from agents.skill_analyzer import match_skills, EMPTY_RESULT
+from agents.skill_dictionary import extract_skills
+from agents.description_preprocessor import prepare_description, SKILL_TOKENS
+
+INTEL_CHARS = 100  # same cap the plain-text company parser used
+FLAG_CHARS = 300
+
+ENRICH_PROMPT = """You are a technical recruiter. Analyze this job posting and fill in the JSON schema.
+
+- required_skills: every technical skill, tool and technology it asks for (languages, frameworks, cloud, databases, tools, specializations)
+{company_rules}- red_flags: warning signs for a candidate (vague role, unpaid overtime, unrealistic requirements, ...), empty list if none
+- green_flags: strong positives (learning budget, remote, clear growth path, modern stack, ...), empty list if none
+- salary_hint: salary or range if stated or clearly implied, else ""
+
+Job Title: {title}
+Company: {company}
+Location: {location}
+Salary: {salary}
+
+Job Description:
+{job_desc}"""
+
+COMPANY_RULES = """- company_mission: 1 sentence, what the company does
+- company_values: 2-3 key words
+- company_culture_keywords: startup/remote/corporate/etc
+- tech_stack: technologies the company uses
+"""
+
+def enrichment_schema(include_company: bool = True) -> Dict[str, Any]:
+    """Response schema for Gemini JSON mode; company fields are skipped when intel is cached."""
+    string_list = {"type": "ARRAY", "items": {"type": "STRING"}}
+    properties = {"required_skills": string_list}
+    if include_company:
+        properties.update({
+            "company_mission": {"type": "STRING"},
+            "company_values": string_list,
+            "company_culture_keywords": string_list,
+            "tech_stack": string_list,
+        })
+    properties.update({
+        "red_flags": string_list,
+        "green_flags": string_list,
+        "salary_hint": {"type": "STRING"},
+    })
+    return {"type": "OBJECT", "properties": properties, "required": list(properties)}
+
+def generation_config(include_company: bool = True) -> Dict[str, Any]:
+    return {"temperature": 0.1, "response_mime_type": "application/json",
+            "response_schema": enrichment_schema(include_company)}
+
+def build_enrichment_prompt(job: Dict[str, Any], include_company: bool = True) -> str:
+    return ENRICH_PROMPT.format(
+        company_rules=COMPANY_RULES if include_company else "",
+        title=job.get('Job Title', ''),
+        company=job.get('Company Name', ''),
+        location=job.get('Location', ''),
+        salary=job.get('Salary Range', '') or 'not stated',
+        job_desc=prepare_description(job, SKILL_TOKENS, 'full'),
+    )
+
+def parse_enrichment(text: str) -> Dict[str, Any]:
+    """The JSON object from the response, {} if there is none."""
+    text = re.sub(r'^```(?:json)?|```$', '', text.strip(), flags=re.MULTILINE).strip()
+    start, end = text.find('{'), text.rfind('}')
+    if start == -1 or end == -1:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+        return data if isinstance(data, dict) else {}
+    except json.JSONDecodeError:
+        return {}
+
+def _as_list(value: Any) -> List[str]:
+    if isinstance(value, str):
+        value = re.split(r'[,\n]+', value)
+    if not isinstance(value, list):
+        return []
+    return [str(v).strip() for v in value if str(v).strip()]
+
+def _as_text(value: Any, limit: int, sep: str = ", ") -> str:
+    text = sep.join(_as_list(value)) if isinstance(value, list) else str(value or '').strip()
+    return text[:limit] if text else 'N/A'
+
+def to_columns(job: Dict[str, Any], data: Dict[str, Any], cached_intel: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Map one fused answer onto COLUMNS (skills match, company intel, flags, salary)."""
+    skills = _as_list(data.get('required_skills'))
+    if not skills:
+        print("   ⚠️ No skills in answer, using dictionary extraction...")
+        skills = extract_skills(job.get('Job Description', ''))
+    columns = match_skills(skills)
+
+    if cached_intel:
+        columns.update(cached_intel)
+    elif 'company_mission' in data:
+        columns.update({
+            'Company Mission': _as_text(data.get('company_mission'), INTEL_CHARS),
+            'Company Values': _as_text(data.get('company_values'), INTEL_CHARS),
+            'Company Culture Keywords': _as_text(data.get('company_culture_keywords'), INTEL_CHARS),
+            'Tech Stack Used': _as_text(data.get('tech_stack'), INTEL_CHARS),
+        })
+    else:
+        columns.update(EMPTY_INTEL)
+
+    columns['Red Flags'] = _as_text(data.get('red_flags'), FLAG_CHARS, sep="; ")
+    columns['Green Flags'] = _as_text(data.get('green_flags'), FLAG_CHARS, sep="; ")
+    salary_hint = str(data.get('salary_hint') or '').strip()
+    if salary_hint and not job.get('Salary Range'):
+        columns['Salary Range'] = salary_hint[:100]
+    return columns
+
+def _prepare(job: Dict[str, Any]):
+    """(prompt, generation config, cached company intel) for one job."""
+    company_name = job.get('Company Name', '')
+    cached_intel = company_store.get(company_name)
+    if cached_intel:
+        print(f"   ♻️ Company intel cached for {company_name}")
+    include_company = not cached_intel
+    return build_enrichment_prompt(job, include_company), generation_config(include_company), cached_intel
+
+def _finish(job: Dict[str, Any], raw: Optional[str], cached_intel: Optional[Dict[str, str]]) -> Dict[str, str]:
+    data = parse_enrichment(raw) if raw else {}
+    if not data:
+        print("   ⚠️ Malformed enrichment answer, falling back to local extraction")
+    columns = to_columns(job, data, cached_intel)
+    if not cached_intel and data:
+        company_store.put(job.get('Company Name', ''), {f: columns[f] for f in INTEL_FIELDS})
+    return columns
+
+async def enrich_job_async(job: Dict[str, Any]) -> Dict[str, str]:
+    """All enrichment columns for one job from a single Gemini call.
+
+    Raises if the call still fails after its retries, so the job is not saved
+    with placeholder columns.
+    """
+    if not job.get('Job Description'):
+        print("   ⚠️ No job description")
+        return dict(EMPTY_RESULT, **EMPTY_INTEL)
+    prompt, config, cached_intel = _prepare(job)
+    raw = await client.generate_content_async(prompt, generation_config=config)
+    return _finish(job, raw, cached_intel)
+
+def enrich_job(job: Dict[str, Any]) -> Dict[str, str]:
+    """Blocking version of enrich_job_async (raises the same way)."""
+    if not job.get('Job Description'):
+        print("   ⚠️ No job description")
+        return dict(EMPTY_RESULT, **EMPTY_INTEL)
+    prompt, config, cached_intel = _prepare(job)
+    raw = client.generate_content(prompt, generation_config=config, raise_errors=True)
+    return _finish(job, raw, cached_intel)
+
+def _enrich_or_none(job: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    try:
+        return enrich_job(job)
+    except Exception as e:
+        print(f"   ❌ Enrichment error ({job.get('Job Title', 'N/A')}): {e}")
+        return None
+
+def enrich_jobs(jobs: List[Dict[str, Any]], max_workers: int = GEMINI_MAX_CONCURRENCY) -> List[Optional[Dict[str, str]]]:
+    """Enrich several jobs concurrently from threaded code (webhook); results in job order.
+
+    A job whose Gemini call failed gets None instead of its columns.
+    """
+    if not jobs:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs))), thread_name_prefix="enrich") as pool:
+        return list(pool.map(_enrich_or_none, jobs))
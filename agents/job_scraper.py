@@ -2,14 +2,17 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import lxml  
-import requests
-from bs4 import BeautifulSoup
-from config.config import JOB_PORTALS, USER_PROFILE
+from utils.scraper_transport import transport
+from utils.job_record import JobRecord
+from config.config import (JOB_PORTALS, USER_PROFILE, ENABLED_PORTALS, CONCURRENT_SCRAPING, PORTAL_TIMEOUTS, PORTAL_CACHE_TTL,
+                           DESCRIPTION_MAX_CHARS)
 from dotenv import load_dotenv
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import time
+import re
+from html import unescape
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from urllib.parse import quote
 from html.parser import HTMLParser
 load_dotenv()
@@ -36,17 +39,59 @@ class HTMLStripper(HTMLParser):
     def get_data(self):
         return ''.join(self.text).strip()
 
-def strip_html(html_text: str) -> str:
-    """Remove HTML tags from text."""
-    if not html_text:
-        return ''
+# One pass over markup: comments, script/style bodies (kept raw, like HTMLParser),
+# tags with quoted attributes, doctypes/PIs. Unterminated constructs run to the end.
+_ATTRS = r"""(?:[^>"']|"[^"]*"|'[^']*')*"""
+_HTML_TOKEN_RE = re.compile(
+    r'<!--.*?(?:-->|\Z)'
+    r'|<(script|style)\b' + _ATTRS + r'>(.*?)(?:</\1\s*>|\Z)'
+    r'|</?[a-zA-Z]' + _ATTRS + r'(?:>|\Z)'
+    r'|<[!?][^>]*(?:>|\Z)',
+    re.S | re.I,
+)
+
+def _strip_html_slow(html_text: str) -> str:
     stripper = HTMLStripper()
     try:
         stripper.feed(html_text)
+        stripper.close()
         return stripper.get_data()
     except:
         return html_text
 
+def strip_html(html_text: str, max_chars: Optional[int] = None) -> str:
+    """
+    Remove HTML tags from text (same output as HTMLStripper).
+    With max_chars, returns strip_html(html_text)[:max_chars] but stops
+    tokenizing as soon as that much text has been found.
+    """
+    if not html_text:
+        return ''
+    if '<' not in html_text:
+        text = unescape(html_text).strip()
+        return text if max_chars is None else text[:max_chars]
+    try:
+        parts, size, pos = [], 0, 0
+        for match in _HTML_TOKEN_RE.finditer(html_text):
+            if match.start() > pos:
+                piece = unescape(html_text[pos:match.start()])
+                parts.append(piece)
+                size += len(piece)
+            if match.group(2):
+                parts.append(match.group(2))
+                size += len(match.group(2))
+            pos = match.end()
+            # Enough non-blank text past the budget: the rest cannot change the prefix
+            if max_chars is not None and size > max_chars and len(''.join(parts).strip()) > max_chars:
+                return ''.join(parts).strip()[:max_chars]
+        if pos < len(html_text):
+            parts.append(unescape(html_text[pos:]))
+        text = ''.join(parts).strip()
+        return text if max_chars is None else text[:max_chars]
+    except Exception:
+        text = _strip_html_slow(html_text)
+        return text if max_chars is None else text[:max_chars]
+
 def scrape_arbeitnow(query: str) -> List[Dict]:
     """Arbeitnow: Free European jobs API (Germany focused)."""
     try:
@@ -55,7 +100,7 @@ def scrape_arbeitnow(query: str) -> List[Dict]:
             "search": query,
             "country": "de"
         }
-        resp = requests.get(url, params=params, timeout=10)
+        resp = transport.get(url, portal="arbeitnow", params=params, timeout=10)
         if resp.status_code != 200:
             return []
         
@@ -63,7 +108,7 @@ def scrape_arbeitnow(query: str) -> List[Dict]:
         jobs = []
         for j in data.get('data', [])[:5]:
             # CLEAN HTML from description
-            clean_desc = strip_html(j.get('description', ''))
+            clean_desc = strip_html(j.get('description', ''), DESCRIPTION_MAX_CHARS)
             
             jobs.append({
                 "Job Portal": "Arbeitnow",
@@ -73,7 +118,7 @@ def scrape_arbeitnow(query: str) -> List[Dict]:
                 "Remote Type": "Remote" if j.get('remote') else "On-site",
                 "Job URL": j.get('url', ''),
                 "Salary Range": "",
-                "Job Description": clean_desc[:500],
+                "Job Description": clean_desc,
                 "Date Scraped": time.strftime("%Y-%m-%d")
             })
         return jobs
@@ -92,7 +137,7 @@ def scrape_arbeitsagentur(query: str, location="Berlin") -> List[Dict]:
             "regionen": location,
             "page": 1
         }
-        resp = requests.get(url, params=params, headers=HEADERS, timeout=10)
+        resp = transport.get(url, portal="arbeitsagentur", params=params, headers=HEADERS, timeout=10)
         if resp.status_code != 200:
             return []
         data = resp.json()
@@ -105,7 +150,7 @@ def scrape_arbeitsagentur(query: str, location="Berlin") -> List[Dict]:
                 "Location": match.get('arbeitgeberort', ''),
                 "Remote Type": "",
                 "Job URL": match.get('joburl', ''),
-                "Job Description": match.get('kurzbeschreibung', '')[:500],
+                "Job Description": match.get('kurzbeschreibung', '')[:DESCRIPTION_MAX_CHARS],
                 "Date Scraped": time.strftime("%Y-%m-%d")
             })
         return jobs
@@ -113,89 +158,114 @@ def scrape_arbeitsagentur(query: str, location="Berlin") -> List[Dict]:
         print(f"Arbeitsagentur error: {e}")
         return []
 
+def _stamp_scraped(jobs: List[Dict]) -> List[Dict]:
+    """Cached feed results keep the date they were parsed; re-stamp them."""
+    today = time.strftime("%Y-%m-%d")
+    for job in jobs:
+        job["Date Scraped"] = today
+    return jobs
+
+def _parse_indeed_rss(resp) -> List[Dict]:
+    from bs4 import BeautifulSoup  # deferred: only parsed on a cache miss
+    
+    #soup = BeautifulSoup(resp.content, 'xml')
+    soup = BeautifulSoup(resp.content, 'html.parser')  # Changed
+    jobs = []
+    for item in soup.find_all('item')[:3]:
+        try:
+            title_text = item.find('title').text if item.find('title') else ''
+            company_text = item.find('author').text if item.find('author') else ''
+            jobs.append({
+                "Job Portal": "Indeed RSS",
+                "Job Title": title_text.split(' - ')[0] if ' - ' in title_text else title_text,
+                "Company Name": company_text,
+                "Location": "Berlin",
+                "Remote Type": "",
+                "Job URL": item.find('link').text if item.find('link') else '',
+                "Job Description": item.find('description').text[:DESCRIPTION_MAX_CHARS] if item.find('description') else '',
+                "Date Scraped": time.strftime("%Y-%m-%d")
+            })
+        except:
+            continue
+    return jobs
+
 def scrape_indeed_rss(query: str) -> List[Dict]:
     """Indeed RSS feed."""
     try:
         url = f"https://de.indeed.com/rss?q={quote(query)}&l=Berlin"
-        resp = requests.get(url, headers=HEADERS, timeout=10)
-        #soup = BeautifulSoup(resp.content, 'xml')
-        soup = BeautifulSoup(resp.content, 'html.parser')  # Changed
-        jobs = []
-        for item in soup.find_all('item')[:3]:
-            try:
-                title_text = item.find('title').text if item.find('title') else ''
-                company_text = item.find('author').text if item.find('author') else ''
-                jobs.append({
-                    "Job Portal": "Indeed RSS",
-                    "Job Title": title_text.split(' - ')[0] if ' - ' in title_text else title_text,
-                    "Company Name": company_text,
-                    "Location": "Berlin",
-                    "Remote Type": "",
-                    "Job URL": item.find('link').text if item.find('link') else '',
-                    "Job Description": item.find('description').text[:500] if item.find('description') else '',
-                    "Date Scraped": time.strftime("%Y-%m-%d")
-                })
-            except:
-                continue
-        return jobs
+        jobs = transport.get_parsed(url, _parse_indeed_rss, portal="indeed", ttl=PORTAL_CACHE_TTL["indeed"],
+                                    headers=HEADERS, timeout=10)
+        return _stamp_scraped(jobs)
     except Exception as e:
         print(f"Indeed RSS error: {e}")
         return []
 
+def _parse_linkedin_rss(resp) -> List[Dict]:
+    from bs4 import BeautifulSoup
+    
+    soup = BeautifulSoup(resp.content, 'xml')
+    jobs = []
+    for item in soup.find_all('item')[:3]:
+        try:
+            title_text = item.find('title').text if item.find('title') else ''
+            desc_text = item.find('description').text if item.find('description') else ''
+            company = title_text.split(' at ')[-1] if ' at ' in title_text else ''
+            jobs.append({
+                "Job Portal": "LinkedIn RSS",
+                "Job Title": title_text.split(' at ')[0] if ' at ' in title_text else title_text,
+                "Company Name": company,
+                "Location": "Berlin",
+                "Remote Type": "",
+                "Job URL": item.find('link').text if item.find('link') else '',
+                "Job Description": desc_text[:DESCRIPTION_MAX_CHARS],
+                "Date Scraped": time.strftime("%Y-%m-%d")
+            })
+        except:
+            continue
+    return jobs
+
 def scrape_linkedin_rss(query: str) -> List[Dict]:
     """LinkedIn RSS feed."""
     try:
         url = f"https://www.linkedin.com/jobs/search/?keywords={quote(query)}&location=Berlin&f_TPR=r2592000&rss=1"
-        resp = requests.get(url, headers=HEADERS, timeout=10)
-        soup = BeautifulSoup(resp.content, 'xml')
-        jobs = []
-        for item in soup.find_all('item')[:3]:
-            try:
-                title_text = item.find('title').text if item.find('title') else ''
-                desc_text = item.find('description').text if item.find('description') else ''
-                company = title_text.split(' at ')[-1] if ' at ' in title_text else ''
-                jobs.append({
-                    "Job Portal": "LinkedIn RSS",
-                    "Job Title": title_text.split(' at ')[0] if ' at ' in title_text else title_text,
-                    "Company Name": company,
-                    "Location": "Berlin",
-                    "Remote Type": "",
-                    "Job URL": item.find('link').text if item.find('link') else '',
-                    "Job Description": desc_text[:500],
-                    "Date Scraped": time.strftime("%Y-%m-%d")
-                })
-            except:
-                continue
-        return jobs
+        jobs = transport.get_parsed(url, _parse_linkedin_rss, portal="linkedin", ttl=PORTAL_CACHE_TTL["linkedin"],
+                                    headers=HEADERS, timeout=10)
+        return _stamp_scraped(jobs)
     except Exception as e:
         print(f"LinkedIn RSS error: {e}")
         return []
 
+def _parse_xing_rss(resp) -> List[Dict]:
+    if resp.status_code == 403:
+        return []
+    from bs4 import BeautifulSoup
+    
+    soup = BeautifulSoup(resp.content, 'xml')
+    jobs = []
+    for item in soup.find_all('item')[:3]:
+        try:
+            jobs.append({
+                "Job Portal": "Xing",
+                "Job Title": item.find('title').text if item.find('title') else '',
+                "Company Name": "",
+                "Location": "Berlin",
+                "Remote Type": "",
+                "Job URL": item.find('link').text if item.find('link') else '',
+                "Job Description": item.find('description').text[:DESCRIPTION_MAX_CHARS] if item.find('description') else '',
+                "Date Scraped": time.strftime("%Y-%m-%d")
+            })
+        except:
+            continue
+    return jobs
+
 def scrape_xing_rss(query: str) -> List[Dict]:
     """Xing RSS feed (if available)."""
     try:
         # Xing RSS: https://www.xing.com/jobs/rss (limited, may require auth)
         url = f"https://www.xing.com/jobs/rss?search={quote(query)}"
-        resp = requests.get(url, headers=HEADERS, timeout=10)
-        if resp.status_code == 403:
-            return []
-        soup = BeautifulSoup(resp.content, 'xml')
-        jobs = []
-        for item in soup.find_all('item')[:3]:
-            try:
-                jobs.append({
-                    "Job Portal": "Xing",
-                    "Job Title": item.find('title').text if item.find('title') else '',
-                    "Company Name": "",
-                    "Location": "Berlin",
-                    "Remote Type": "",
-                    "Job URL": item.find('link').text if item.find('link') else '',
-                    "Job Description": item.find('description').text[:500] if item.find('description') else '',
-                    "Date Scraped": time.strftime("%Y-%m-%d")
-                })
-            except:
-                continue
-        return jobs
+        jobs = transport.get_parsed(url, _parse_xing_rss, portal="xing", ttl=PORTAL_CACHE_TTL["xing"],
+                                    headers=HEADERS, timeout=10)
+        return _stamp_scraped(jobs)
     except Exception as e:
         print(f"Xing RSS error: {e}")
         return []
@@ -212,7 +282,7 @@ def scrape_adzuna(query: str, page: int = 1) -> List[Dict]:
         
         url = f"https://api.adzuna.com/v1/api/jobs/de/search/{page}?app_id={app_id}&app_key={api_key}&what={quote(query)}&results_per_page=10"
         
-        resp = requests.get(url, timeout=10, headers={"Accept": "application/json"})
+        resp = transport.get(url, portal="adzuna", timeout=10, headers={"Accept": "application/json"})
         if resp.status_code != 200:
             return []
         
@@ -227,7 +297,7 @@ def scrape_adzuna(query: str, page: int = 1) -> List[Dict]:
                 "Remote Type": "On-site",
                 "Job URL": j.get('redirect_url', ''),
                 "Salary Range": f"{j.get('salary_min', '')}-{j.get('salary_max', '')}" if j.get('salary_min') else "",
-                "Job Description": strip_html(j.get('description', ''))[:500],
+                "Job Description": strip_html(j.get('description', ''), DESCRIPTION_MAX_CHARS),
                 "Date Scraped": time.strftime("%Y-%m-%d")
             })
         return jobs
@@ -235,19 +305,80 @@ def scrape_adzuna(query: str, page: int = 1) -> List[Dict]:
         print(f"Adzuna error: {e}")
         return []
 
-def scrape_jobs(query: str = "python developer", page: int = 1) -> List[Dict]:
-    """Multi-platform: Adzuna (paginated) + RSS."""
+# name -> (label, scraper, takes page argument)
+PORTAL_SCRAPERS = {
+    "adzuna": ("Adzuna", scrape_adzuna, True),
+    "indeed": ("Indeed RSS", scrape_indeed_rss, False),
+    "arbeitnow": ("Arbeitnow", scrape_arbeitnow, False),
+    "arbeitsagentur": ("Arbeitsagentur", scrape_arbeitsagentur, False),
+    "linkedin": ("LinkedIn RSS", scrape_linkedin_rss, False),
+    "xing": ("Xing", scrape_xing_rss, False),
+}
+
+def _run_portal(name: str, query: str, page: int) -> List[Dict]:
+    label, scraper, takes_page = PORTAL_SCRAPERS[name]
+    return scraper(query, page) if takes_page else scraper(query)
+
+def scrape_jobs_concurrent(query: str, page: int = 1, portals: List[str] = None) -> List[Dict]:
+    """Fan out to all enabled portals at once, merging results as they arrive.
+
+    Each portal gets its own deadline from PORTAL_TIMEOUTS; a portal that
+    misses it is dropped so total latency stays at the slowest healthy portal.
+    """
+    portals = [p for p in (portals or ENABLED_PORTALS) if p in PORTAL_SCRAPERS]
+    if not portals:
+        return []
+
+    print(f"Scraping {len(portals)} portals in parallel (query: '{query}', page: {page})...")
+    all_jobs = []
+    start = time.monotonic()
+    pool = ThreadPoolExecutor(max_workers=len(portals), thread_name_prefix="scraper")
+    pending = {}
+    for name in portals:
+        future = pool.submit(_run_portal, name, query, page)
+        pending[future] = (name, start + PORTAL_TIMEOUTS.get(name, 10))
+
+    try:
+        while pending:
+            next_deadline = min(deadline for _, deadline in pending.values())
+            done, _ = wait(pending, timeout=max(next_deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name, _ = pending.pop(future)
+                try:
+                    jobs = future.result()
+                except Exception as e:
+                    print(f"{PORTAL_SCRAPERS[name][0]} error: {e}")
+                    continue
+                print(f"  {PORTAL_SCRAPERS[name][0]}: {len(jobs)} jobs ({time.monotonic() - start:.1f}s)")
+                all_jobs += jobs
+
+            now = time.monotonic()
+            for future, (name, deadline) in list(pending.items()):
+                if now >= deadline:
+                    future.cancel()
+                    del pending[future]
+                    print(f"  ⚠️ {PORTAL_SCRAPERS[name][0]} timed out after {PORTAL_TIMEOUTS.get(name, 10)}s")
+    finally:
+        # Don't block on stragglers; their results are discarded
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return all_jobs
+
+def scrape_jobs(query: str = "python developer", page: int = 1, concurrent: bool = CONCURRENT_SCRAPING) -> List[JobRecord]:
+    """Multi-platform: Adzuna (paginated) + RSS. Jobs leave here as JobRecords."""
+    if concurrent:
+        return [JobRecord(job) for job in scrape_jobs_concurrent(query, page)]
+
     all_jobs = []
     
     print(f"Scraping Adzuna (query: '{query}', page: {page})...")
     all_jobs += scrape_adzuna(query, page)
-    time.sleep(1)
     
     print("Scraping Indeed RSS...")
     all_jobs += scrape_indeed_rss(query)
     
-    return all_jobs
-
+    return [JobRecord(job) for job in all_jobs]
 
 
 if __name__ == "__main__":
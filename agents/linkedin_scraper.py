@@ -1,13 +1,15 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 from typing import List, Dict
 
 def scrape_linkedin(query: str) -> List[Dict]:
     """LinkedIn scraping (HIGH RISK - ToS violation, IP blocks likely)."""
+    # Deferred: selenium + webdriver_manager are slow to import and rarely used
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from webdriver_manager.chrome import ChromeDriverManager
+    
     jobs = []
     
     try:
@@ -0,0 +1,90 @@
+"""
+LLM Cache - CONTENT-ADDRESSED GEMINI RESPONSES
+Key = sha256(model + generation config + prompt); TTL + LRU eviction
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))  # Project root
+
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config.config import LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES
+from utils.local_db import connect
+
+class LLMCache:
+    def __init__(self, name: str = "llm_cache", ttl: int = LLM_CACHE_TTL, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = connect(name)
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses (last_access)")
+        self.entries = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(model: str, generation_config: Optional[Dict[str, Any]], prompt: str) -> str:
+        config = json.dumps(generation_config or {}, sort_keys=True, default=str)
+        return hashlib.sha256(f"{model}\x00{config}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row['created_at'] > self.ttl:
+                if row is not None:
+                    self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.entries -= 1
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row['response']
+
+    def put(self, key: str, response: str):
+        now = time.time()
+        with self.lock:
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO responses (key, response, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            if cur.rowcount == 0:
+                self.conn.execute(
+                    "UPDATE responses SET response = ?, created_at = ?, last_access = ? WHERE key = ?",
+                    (response, now, now, key),
+                )
+                return
+            self.entries += 1
+            if self.entries > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """Drop expired entries, then the least recently used ones."""
+        self.conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+        self.entries = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = self.entries - self.max_entries
+        if overflow > 0:
+            self.conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                (overflow,),
+            )
+            self.entries -= overflow
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            'entries': self.entries,
+        }
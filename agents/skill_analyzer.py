@@ -1,49 +1,54 @@
 """
 Skill Analysis - BETTER PROMPTING + FALLBACK PARSING
 """
-import google.generativeai as genai
 import json
 import re
+from typing import Dict, List
 from utils.cv_parser import cv_parser
-from config.config import GEMINI_API_KEY
+from agents.gemini_client import client, estimate_tokens
+from agents.skill_dictionary import extract_skills
+from agents.skill_matcher import get_cv_matcher
+from agents.description_preprocessor import prepare_description, SKILL_TOKENS
+from config.config import SKILL_BATCH_MAX_JOBS, SKILL_BATCH_TOKEN_BUDGET
 
-genai.configure(api_key=GEMINI_API_KEY)
+EMPTY_RESULT = {
+    'Skills Match %': '0%',
+    'Required Skills': 'N/A',
+    'Your Matching Skills': 'N/A',
+    'Missing Skills': 'N/A',
+    'Learnable in 1 Week?': 'N/A',
+    'Experience Level Match': 'N/A'
+}
+
+ERROR_RESULT = dict(EMPTY_RESULT, **{'Experience Level Match': 'Error'})
+
+SKILL_PROMPT = """You are a technical recruiter. Extract ALL technical skills, tools, and technologies mentioned in this job posting.
+
+Include:
+- Programming languages (Python, Java, etc)
+- Frameworks (React, Django, etc)
+- Cloud platforms (AWS, Azure, GCP)
+- Databases (SQL, MongoDB, etc)
+- Tools & services (Docker, Kubernetes, Git, etc)
+- Specializations (Data Engineering, DevOps, etc)
+
+Return ONLY a comma-separated list, nothing else:
+Python, AWS, Docker, Kubernetes, Data Engineering
+
+Job Description:
+{job_desc}"""
+
+BATCH_SKILL_PROMPT = """You are a technical recruiter. For EACH job posting below, extract ALL technical skills, tools, and technologies it mentions
+(programming languages, frameworks, cloud platforms, databases, tools & services, specializations).
+
+Return ONLY a JSON object mapping the job number to its list of skills, e.g.:
+{{"0": ["Python", "AWS", "Docker"], "1": ["Java", "Kubernetes"]}}
+
+{postings}"""
 
 def extract_skills_from_text(text: str) -> list:
-    """Fallback: Extract skills using regex patterns."""
-    skills = []
-    
-    # Common tech keywords
-    tech_keywords = [
-        'python', 'java', 'javascript', 'typescript', 'golang', 'rust', 'c++', 'c#', 'php', 'swift', 'kotlin',
-        'react', 'vue', 'angular', 'nodejs', 'express', 'django', 'flask', 'fastapi', 'spring',
-        'aws', 'azure', 'gcp', 'google cloud', 'heroku', 'docker', 'kubernetes', 'jenkins', 'gitlab',
-        'sql', 'postgres', 'mysql', 'mongodb', 'redis', 'elasticsearch', 'dynamodb', 'firestore',
-        'git', 'github', 'gitlab', 'bitbucket', 'jira', 'confluence', 'slack',
-        'machine learning', 'deep learning', 'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy',
-        'data engineering', 'data pipeline', 'etl', 'apache spark', 'kafka', 'airflow',
-        'devops', 'ci/cd', 'linux', 'windows', 'macos', 'unix',
-        'rest api', 'graphql', 'websocket', 'grpc',
-        'agile', 'scrum', 'kanban', 'waterfall',
-        'text-to-speech', 'nlp', 'computer vision', 'image processing',
-        'ios', 'android', 'mobile', 'app development', 'web development',
-        'microservices', 'monolithic', 'serverless', 'lambda',
-        'html', 'css', 'sass', 'webpack', 'babel', 'npm', 'yarn',
-        'junit', 'pytest', 'mocha', 'jasmine', 'testing', 'tdd',
-        'data science', 'analytics', 'tableau', 'power bi', 'looker',
-        'architecture', 'design patterns', 'oop', 'functional programming'
-    ]
-    
-    text_lower = text.lower()
-    
-    for keyword in tech_keywords:
-        if keyword in text_lower:
-            # Capitalize first letter of each word
-            formatted = ' '.join(word.capitalize() for word in keyword.split())
-            if formatted not in skills:
-                skills.append(formatted)
-    
-    return skills
+    """Fallback: one pass of the shared skill dictionary over the text."""
+    return extract_skills(text)
 
 def parse_skills_text(text: str) -> list:
     """Parse skills from various formats: JSON, lists, comma-separated."""
@@ -85,124 +90,173 @@ def similarity(a: str, b: str) -> float:
     from difflib import SequenceMatcher
     return SequenceMatcher(None, a, b).ratio()
 
+def extract_job_skills(job_desc: str) -> List[str]:
+    """One Gemini call for one description, regex fallback if it returns nothing."""
+    job_skills_raw = client.generate_content(SKILL_PROMPT.format(job_desc=job_desc),
+                                             generation_config=None, raise_errors=True)
+    print(f"   Raw response: {job_skills_raw[:100]}...")
+    
+    # Parse skills
+    job_skills = parse_skills_text(job_skills_raw)
+    
+    # FALLBACK: If Gemini returns nothing, use regex fallback
+    if not job_skills or job_skills == ['Unknown']:
+        print("   ⚠️ Gemini returned nothing, using fallback extraction...")
+        job_skills = extract_skills_from_text(job_desc)
+    
+    return job_skills
+
+def _split_batches(items: List[tuple], token_budget: int, max_jobs: int) -> List[List[tuple]]:
+    """Greedy packing of (index, description) pairs under the token budget."""
+    overhead = estimate_tokens(BATCH_SKILL_PROMPT)
+    batches, current, used = [], [], overhead
+    for idx, desc in items:
+        cost = estimate_tokens(desc) + 10
+        if current and (used + cost > token_budget or len(current) >= max_jobs):
+            batches.append(current)
+            current, used = [], overhead
+        current.append((idx, desc))
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def _parse_batch_response(text: str) -> dict:
+    text = re.sub(r'^```(?:json)?|```$', '', text.strip(), flags=re.MULTILINE).strip()
+    start, end = text.find('{'), text.rfind('}')
+    if start == -1 or end == -1:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+        return data if isinstance(data, dict) else {}
+    except json.JSONDecodeError:
+        return {}
+
+def extract_job_skills_batch(descriptions: List[str], token_budget: int = SKILL_BATCH_TOKEN_BUDGET,
+                             max_jobs: int = SKILL_BATCH_MAX_JOBS) -> Dict[int, List[str]]:
+    """Extract skills for many descriptions with one prompt per batch.
+
+    Batches are split to stay under token_budget. Items missing or malformed
+    in the batch answer fall back to extract_job_skills one by one.
+    Returns {index in descriptions: skills}.
+    """
+    results = {}
+    items = [(i, d) for i, d in enumerate(descriptions) if d]
+    for batch in _split_batches(items, token_budget, max_jobs):
+        postings = "\n\n".join(f"### Job {idx}\n{desc}" for idx, desc in batch)
+        print(f"   ⚙️ Extracting skills for {len(batch)} jobs in one call...")
+        try:
+            raw = client.generate_content(BATCH_SKILL_PROMPT.format(postings=postings), raise_errors=True,
+                                          generation_config={"temperature": 0.1, "response_mime_type": "application/json"})
+            parsed = _parse_batch_response(raw)
+        except Exception as e:
+            print(f"   ⚠️ Batch call failed: {e}")
+            parsed = {}
+
+        for idx, desc in batch:
+            skills = parsed.get(str(idx))
+            if isinstance(skills, list) and skills and all(isinstance(x, str) for x in skills):
+                results[idx] = [x.strip() for x in skills if x.strip()]
+                continue
+            print(f"   ⚠️ Job {idx} malformed in batch, extracting alone...")
+            try:
+                results[idx] = extract_job_skills(desc)
+            except Exception as e:
+                print(f"   ❌ Skill error: {e}")
+                results[idx] = extract_skills_from_text(desc)
+    return results
+
+def _cv_matcher():
+    cv_profile = cv_parser.get_profile()
+    cv_skills = list(cv_profile.get('skills', {}).keys())
+    print(f"   📄 Your skills ({len(cv_skills)}): {cv_skills[:5]}...")
+    return get_cv_matcher(cv_skills)
+
+def format_skill_result(job_skills: List[str], matching: List[str], missing: List[str]) -> dict:
+    """Learnable check, match % and clean Sheets text for one job."""
+    # STEP 4: Learnable skills
+    learnable_keywords = ['react', 'javascript', 'typescript', 'kubernetes', 'spark', 'scala', 'docker', 'git', 'jenkins', 'kafka', 'jenkins', 'terraform']
+    learnable = [s for s in missing if any(kw in s.lower() for kw in learnable_keywords)]
+    
+    # STEP 5: Calculate match percentage
+    match_pct = (len(matching) / max(len(job_skills), 1)) * 100 if job_skills else 0
+    
+    print(f"   ✅ Match: {len(matching)}/{len(job_skills)} ({match_pct:.0f}%)")
+    print(f"   ❌ Missing: {len(missing)}")
+    print(f"   📚 Learnable: {len(learnable)}\n")
+    
+    # STEP 6: Format for Sheets (CLEAN TEXT ONLY)
+    result = {
+        'Skills Match %': f"{match_pct:.0f}%",
+        'Required Skills': format_for_sheets(job_skills),
+        'Your Matching Skills': format_for_sheets(matching) if matching else "N/A",
+        'Missing Skills': format_for_sheets(missing) if missing else "N/A",
+        'Learnable in 1 Week?': 'Yes' if learnable else 'No',
+        'Experience Level Match': (
+            'Advanced Match' if match_pct >= 80 else
+            'Intermediate Match' if match_pct >= 50 else
+            'Learning Opportunity'
+        )
+    }
+    
+    print(f"   📊 Final: {result['Skills Match %']} match\n")
+    return result
+
+def match_skills(job_skills: List[str]) -> dict:
+    """Compare extracted job skills with YOUR CV and format the Sheets columns."""
+    if not job_skills:
+        job_skills = ['General Technical Skills']
+    
+    print(f"   ✅ Found {len(job_skills)} skills: {job_skills[:5]}...")
+    
+    # STEP 2-3: CV skills (precomputed per profile) + match logic
+    matching, missing = _cv_matcher().match(job_skills)
+    return format_skill_result(job_skills, matching, missing)
+
 def analyze_job_skills(job: dict) -> dict:
     """Extract job skills + compare with YOUR CV."""
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
-        job_desc = job.get('Job Description', '')[:3000]
+        job_desc = prepare_description(job, SKILL_TOKENS, 'skills')
         
         if not job_desc:
             print("   ⚠️ No job description")
-            return {
-                'Skills Match %': '0%',
-                'Required Skills': 'N/A',
-                'Your Matching Skills': 'N/A',
-                'Missing Skills': 'N/A',
-                'Learnable in 1 Week?': 'N/A',
-                'Experience Level Match': 'N/A'
-            }
+            return dict(EMPTY_RESULT)
         
         # STEP 1: Extract job skills with BETTER PROMPT
         print("   ⚙️ Extracting job skills...")
+        job_skills = extract_job_skills(job_desc)
         
-        prompt = f"""You are a technical recruiter. Extract ALL technical skills, tools, and technologies mentioned in this job posting.
-
-Include:
-- Programming languages (Python, Java, etc)
-- Frameworks (React, Django, etc)
-- Cloud platforms (AWS, Azure, GCP)
-- Databases (SQL, MongoDB, etc)
-- Tools & services (Docker, Kubernetes, Git, etc)
-- Specializations (Data Engineering, DevOps, etc)
-
-Return ONLY a comma-separated list, nothing else:
-Python, AWS, Docker, Kubernetes, Data Engineering
-
-Job Description:
-{job_desc}"""
-        
-        response = model.generate_content(prompt)
-        job_skills_raw = response.text.strip()
-        print(f"   Raw response: {job_skills_raw[:100]}...")
-        
-        # Parse skills
-        job_skills = parse_skills_text(job_skills_raw)
-        
-        # FALLBACK: If Gemini returns nothing, use regex fallback
-        if not job_skills or job_skills == ['Unknown']:
-            print("   ⚠️ Gemini returned nothing, using fallback extraction...")
-            job_skills = extract_skills_from_text(job_desc)
-        
-        if not job_skills:
-            job_skills = ['General Technical Skills']
-        
-        print(f"   ✅ Found {len(job_skills)} skills: {job_skills[:5]}...")
-        
-        # STEP 2: Get YOUR CV skills
-        cv_profile = cv_parser.get_profile()
-        cv_skills = list(cv_profile.get('skills', {}).keys())
-        print(f"   📄 Your skills ({len(cv_skills)}): {cv_skills[:5]}...")
-        
-        # STEP 3: Match logic
-        matching = []
-        missing = []
-        
-        for job_skill in job_skills:
-            job_skill_lower = job_skill.lower().strip()
-            found = False
-            
-            for cv_skill in cv_skills:
-                cv_skill_lower = cv_skill.lower().strip()
-                
-                # Exact or partial match
-                if (job_skill_lower == cv_skill_lower or
-                    job_skill_lower in cv_skill_lower or
-                    cv_skill_lower in job_skill_lower or
-                    similarity(job_skill_lower, cv_skill_lower) > 0.75):
-                    matching.append(job_skill)
-                    found = True
-                    break
-            
-            if not found:
-                missing.append(job_skill)
-        
-        # STEP 4: Learnable skills
-        learnable_keywords = ['react', 'javascript', 'typescript', 'kubernetes', 'spark', 'scala', 'docker', 'git', 'jenkins', 'kafka', 'jenkins', 'terraform']
-        learnable = [s for s in missing if any(kw in s.lower() for kw in learnable_keywords)]
-        
-        # STEP 5: Calculate match percentage
-        match_pct = (len(matching) / max(len(job_skills), 1)) * 100 if job_skills else 0
-        
-        print(f"   ✅ Match: {len(matching)}/{len(job_skills)} ({match_pct:.0f}%)")
-        print(f"   ❌ Missing: {len(missing)}")
-        print(f"   📚 Learnable: {len(learnable)}\n")
-        
-        # STEP 6: Format for Sheets (CLEAN TEXT ONLY)
-        result = {
-            'Skills Match %': f"{match_pct:.0f}%",
-            'Required Skills': format_for_sheets(job_skills),
-            'Your Matching Skills': format_for_sheets(matching) if matching else "N/A",
-            'Missing Skills': format_for_sheets(missing) if missing else "N/A",
-            'Learnable in 1 Week?': 'Yes' if learnable else 'No',
-            'Experience Level Match': (
-                'Advanced Match' if match_pct >= 80 else
-                'Intermediate Match' if match_pct >= 50 else
-                'Learning Opportunity'
-            )
-        }
-        
-        print(f"   📊 Final: {result['Skills Match %']} match\n")
-        return result
+        return match_skills(job_skills)
         
     except Exception as e:
         print(f"   ❌ Skill error: {e}")
         import traceback
         traceback.print_exc()
-        return {
-            'Skills Match %': '0%',
-            'Required Skills': 'N/A',
-            'Your Matching Skills': 'N/A',
-            'Missing Skills': 'N/A',
-            'Learnable in 1 Week?': 'N/A',
-            'Experience Level Match': 'Error'
-        }
+        return dict(ERROR_RESULT)
+
+def analyze_jobs_skills(jobs: List[dict]) -> List[dict]:
+    """Batch version of analyze_job_skills: one result per job, same order."""
+    descriptions = [prepare_description(job, SKILL_TOKENS, 'skills') for job in jobs]
+    try:
+        skills_by_idx = extract_job_skills_batch(descriptions)
+    except Exception as e:
+        print(f"   ❌ Batch skill error: {e}")
+        return [analyze_job_skills(job) for job in jobs]
+
+    job_skill_lists = [skills_by_idx.get(idx) or ['General Technical Skills'] for idx in range(len(jobs))]
+    try:
+        # All jobs scored against the CV in one batched pass
+        matches = _cv_matcher().match_batch(job_skill_lists)
+    except Exception as e:
+        print(f"   ❌ Skill error: {e}")
+        return [dict(ERROR_RESULT) if desc else dict(EMPTY_RESULT) for desc in descriptions]
+
+    results = []
+    for idx, desc in enumerate(descriptions):
+        if not desc:
+            print("   ⚠️ No job description")
+            results.append(dict(EMPTY_RESULT))
+            continue
+        matching, missing = matches[idx]
+        results.append(format_skill_result(job_skill_lists[idx], matching, missing))
+    return results
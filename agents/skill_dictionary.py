@@ -0,0 +1,244 @@
+"""
+Skill Dictionary - ONE SHARED SKILL LIST + ALIASES
+Compiled once into an Aho-Corasick automaton; a single pass finds every skill
+on word boundaries ("git" doesn't hit "digital", "rust" doesn't hit "trust").
+Versioned spellings glued to a name ("python3") only match if listed as an alias.
+"""
+from typing import Dict, List
+
+# Canonical name -> lowercase aliases (the canonical name itself is always matched)
+SKILL_ALIASES: Dict[str, List[str]] = {
+    # Languages
+    'Python': ['python3'],
+    'Java': [],
+    'JavaScript': [],
+    'TypeScript': [],
+    'Golang': [],
+    'Rust': [],
+    'C++': ['cpp'],
+    'C#': ['csharp'],
+    'PHP': [],
+    'Swift': [],
+    'Kotlin': [],
+    'Scala': [],
+    'SQL': [],
+    'ABAP': [],
+    'HTML': ['html5'],
+    'CSS': ['css3'],
+    'Sass': ['scss'],
+    # Frameworks & libraries
+    'React': ['react.js', 'reactjs'],
+    'Vue': ['vue.js', 'vuejs', 'vue3'],
+    'Angular': ['angularjs'],
+    'Node.js': ['nodejs', 'node js'],
+    'Express': ['express.js', 'expressjs'],
+    'Django': [],
+    'Flask': [],
+    'FastAPI': [],
+    'Spring': ['spring boot'],
+    'TensorFlow': [],
+    'PyTorch': [],
+    'Scikit-learn': ['sklearn', 'scikit learn'],
+    'Pandas': [],
+    'NumPy': [],
+    'XGBoost': [],
+    'Optuna': [],
+    'LangChain': [],
+    'CrewAI': [],
+    'Hugging Face': ['huggingface'],
+    # Cloud
+    'AWS': ['amazon web services'],
+    'Azure': ['microsoft azure'],
+    'GCP': ['google cloud', 'google cloud platform'],
+    'Heroku': [],
+    'AWS Lambda': ['lambda'],
+    'S3': ['aws s3'],
+    'AWS Glue': ['glue'],
+    'ECS': ['aws ecs'],
+    'ECR': ['aws ecr'],
+    'RDS': ['aws rds'],
+    'VPC': [],
+    'ALB': [],
+    'CloudFormation': [],
+    'CloudWatch': [],
+    'Serverless': [],
+    # Containers, CI/CD, tooling
+    'Docker': [],
+    'Kubernetes': ['k8s'],
+    'Terraform': [],
+    'Jenkins': [],
+    'GitLab': [],
+    'Git': [],
+    'GitHub': [],
+    'Bitbucket': [],
+    'Jira': [],
+    'Confluence': [],
+    'Slack': [],
+    'CI/CD': ['ci cd', 'cicd'],
+    'DevOps': [],
+    'Linux': [],
+    'Windows': [],
+    'macOS': [],
+    'Unix': [],
+    'Control-M': [],
+    'n8n': [],
+    'MCP': [],
+    'npm': [],
+    'Yarn': [],
+    'Webpack': [],
+    'Babel': [],
+    # Data
+    'PostgreSQL': ['postgres'],
+    'MySQL': [],
+    'MongoDB': ['mongo'],
+    'Redis': [],
+    'Elasticsearch': [],
+    'DynamoDB': [],
+    'Firestore': [],
+    'BigQuery': [],
+    'Snowflake': [],
+    'dbt': [],
+    'Databricks': [],
+    'Synapse': ['azure synapse'],
+    'Teradata': [],
+    'Apache Spark': ['spark', 'pyspark'],
+    'Kafka': ['apache kafka'],
+    'Airflow': ['apache airflow'],
+    'ETL': [],
+    'Data Engineering': [],
+    'Data Pipeline': ['data pipelines'],
+    'Data Science': [],
+    'Analytics': [],
+    'Tableau': [],
+    'Power BI': ['powerbi'],
+    'Looker': [],
+    'Excel': [],
+    # ML / AI
+    'Machine Learning': [],
+    'Deep Learning': [],
+    'NLP': ['natural language processing'],
+    'Computer Vision': [],
+    'Image Processing': [],
+    'Text-to-Speech': ['tts'],
+    # APIs & architecture
+    'REST API': ['rest apis', 'restful'],
+    'GraphQL': [],
+    'WebSocket': ['websockets'],
+    'gRPC': [],
+    'Microservices': [],
+    'Monolithic': [],
+    'Architecture': [],
+    'Design Patterns': [],
+    'OOP': [],
+    'Functional Programming': [],
+    # Mobile & web
+    'iOS': [],
+    'Android': [],
+    'Mobile': [],
+    'App Development': [],
+    'Web Development': [],
+    # Testing & process
+    'JUnit': [],
+    'pytest': [],
+    'Mocha': [],
+    'Jasmine': [],
+    'Testing': [],
+    'TDD': [],
+    'Agile': [],
+    'Scrum': [],
+    'Kanban': [],
+    'Waterfall': [],
+}
+
+# Aliases that are ordinary words elsewhere ("glue code", "lambda functions", "spring 2025"):
+# they only count when one of these canonical skills is found in the same text
+CONTEXT_ALIASES: Dict[str, List[str]] = {
+    'lambda': ['AWS'],
+    'glue': ['AWS'],
+    'spring': ['Java', 'Kotlin'],
+}
+
+# The concrete tech the CV fallback looks for (the previous cv_parser regex list). Generic
+# terms such as Testing, Agile or Architecture would match almost any job description.
+CV_SKILLS = [
+    'Python', 'SQL', 'JavaScript', 'BigQuery', 'ABAP', 'Git', 'GitHub', 'LangChain', 'CrewAI', 'PyTorch',
+    'TensorFlow', 'Hugging Face', 'AWS', 'Azure', 'Docker', 'Kubernetes', 'Terraform', 'Jenkins', 'n8n', 'MCP',
+    'Power BI', 'Tableau', 'Excel', 'Teradata', 'Airflow', 'Kafka', 'Snowflake', 'dbt', 'Databricks', 'Synapse',
+    'FastAPI', 'XGBoost', 'Optuna', 'CloudFormation', 'CloudWatch', 'S3', 'AWS Lambda', 'AWS Glue', 'ECS', 'ECR',
+    'RDS', 'VPC', 'ALB', 'Control-M', 'Jira', 'Confluence',
+]
+
+class SkillAutomaton:
+    """Aho-Corasick over all aliases; matches must sit on word boundaries."""
+
+    def __init__(self, aliases: Dict[str, List[str]], context: Dict[str, List[str]] = None):
+        self.context = context or {}
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[tuple]] = [[]]  # (pattern length, canonical, pattern)
+
+        for canonical, alias_list in aliases.items():
+            for pattern in [canonical.lower()] + list(alias_list):
+                self._add(pattern, canonical)
+        self._build_failure_links()
+
+    def _add(self, pattern: str, canonical: str):
+        node = 0
+        for ch in pattern:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = nxt
+        self.output[node].append((len(pattern), canonical, pattern))
+
+    def _build_failure_links(self):
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0) if self.goto[f].get(ch, 0) != nxt else 0
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def find(self, text: str) -> List[str]:
+        """Canonical skills in order of first appearance."""
+        text = text.lower()
+        n = len(text)
+        found = {}
+        conditional = {}  # canonical -> (start, alias) for CONTEXT_ALIASES hits
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for length, canonical, pattern in self.output[node]:
+                start = i - length + 1
+                if pattern[0].isalnum() and start > 0 and text[start - 1].isalnum():
+                    continue
+                if pattern[-1].isalnum() and i + 1 < n and text[i + 1].isalnum():
+                    continue
+                if pattern in self.context:
+                    conditional.setdefault(canonical, (start, pattern))
+                elif canonical not in found:
+                    found[canonical] = start
+        for canonical, (start, pattern) in conditional.items():
+            if any(req in found for req in self.context[pattern]):
+                found[canonical] = min(start, found.get(canonical, start))
+        return sorted(found, key=found.get)
+
+# Compiled once at import
+skill_automaton = SkillAutomaton(SKILL_ALIASES, CONTEXT_ALIASES)
+cv_skill_automaton = SkillAutomaton({skill: SKILL_ALIASES[skill] for skill in CV_SKILLS}, CONTEXT_ALIASES)
+
+def extract_skills(text: str) -> List[str]:
+    return skill_automaton.find(text or '')
+
+def extract_cv_skills(text: str) -> List[str]:
+    """CV fallback: concrete tech only (CV_SKILLS)."""
+    return cv_skill_automaton.find(text or '')
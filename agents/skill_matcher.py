@@ -0,0 +1,77 @@
+"""
+Skill Matcher - CV SKILLS PRECOMPUTED ONCE PER PROFILE
+Same rule as before (exact, substring either way, or difflib ratio > 0.75),
+scored for a whole batch of jobs in one call
+"""
+import threading
+from difflib import SequenceMatcher
+from typing import Dict, List, Tuple
+
+SIMILARITY_THRESHOLD = 0.75
+
+class CVSkillMatcher:
+    def __init__(self, cv_skills: List[str]):
+        self.cv_skills = [s.lower().strip() for s in cv_skills]
+        self.cv_set = set(self.cv_skills)
+        # difflib indexes the second sequence; build that index once per CV skill. set_seq1
+        # mutates a matcher, and enrich/webhook threads share this object, so one set per thread
+        self._local = threading.local()
+        self._memo: Dict[str, bool] = {}
+
+    def _matchers(self) -> List[tuple]:
+        matchers = getattr(self._local, 'matchers', None)
+        if matchers is None:
+            matchers = self._local.matchers = [(cv, len(cv), SequenceMatcher(None, '', cv))
+                                               for cv in self.cv_skills]
+        return matchers
+
+    def _score(self, job_skill: str) -> bool:
+        if job_skill in self.cv_set:
+            return True
+        for cv in self.cv_skills:
+            if job_skill in cv or cv in job_skill:
+                return True
+
+        la = len(job_skill)
+        for cv, lb, matcher in self._matchers():
+            # ratio = 2*M/(la+lb) can't beat 2*min(la, lb)/(la+lb); skip hopeless pairs
+            if 2 * min(la, lb) <= SIMILARITY_THRESHOLD * (la + lb):
+                continue
+            matcher.set_seq1(job_skill)
+            if (matcher.real_quick_ratio() > SIMILARITY_THRESHOLD and
+                    matcher.quick_ratio() > SIMILARITY_THRESHOLD and
+                    matcher.ratio() > SIMILARITY_THRESHOLD):
+                return True
+        return False
+
+    def is_match(self, job_skill: str) -> bool:
+        key = job_skill.lower().strip()
+        hit = self._memo.get(key)
+        if hit is None:
+            hit = self._memo[key] = self._score(key)
+        return hit
+
+    def match(self, job_skills: List[str]) -> Tuple[List[str], List[str]]:
+        """(matching, missing) in job skill order."""
+        matching, missing = [], []
+        for skill in job_skills:
+            (matching if self.is_match(skill) else missing).append(skill)
+        return matching, missing
+
+    def match_batch(self, jobs_skills: List[List[str]]) -> List[Tuple[List[str], List[str]]]:
+        """Score every distinct skill across the batch once, then split per job."""
+        for skill in {s.lower().strip() for skills in jobs_skills for s in skills}:
+            if skill not in self._memo:
+                self._memo[skill] = self._score(skill)
+        return [self.match(skills) for skills in jobs_skills]
+
+_matcher_cache: Dict[tuple, CVSkillMatcher] = {}
+
+def get_cv_matcher(cv_skills: List[str]) -> CVSkillMatcher:
+    """One matcher per distinct CV skill list (i.e. per parsed profile)."""
+    key = tuple(cv_skills)
+    matcher = _matcher_cache.get(key)
+    if matcher is None:
+        _matcher_cache.clear()
+        matcher = _matcher_cache[key] = CVSkillMatcher(cv_skills)
+    return matcher
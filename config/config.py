@@ -8,10 +8,86 @@ from dotenv import load_dotenv
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash-lite")
+
+# Persistent Gemini response cache
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+# Gemini quota scheduling (set a little under the real project quota)
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "14"))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "240000"))
+
+# Jobs of one page enriched at the same time in main.orchestrate (1 = one by one)
+ENRICH_CONCURRENCY = int(os.getenv("ENRICH_CONCURRENCY", "4"))
+# Jobs buffered between pipeline stages in main.orchestrate_batch (backpressure)
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "20"))
+
+# Webhook commands run in the background by this many worker threads
+COMMAND_WORKERS = int(os.getenv("COMMAND_WORKERS", "2"))
+# A running command's lease; renewed while it runs, only expired leases are taken over after a restart
+COMMAND_LEASE_SECONDS = int(os.getenv("COMMAND_LEASE_SECONDS", "300"))
+
+# Merge a run's ≥85 matches into one WhatsApp message instead of one per job
+WHATSAPP_DIGEST = os.getenv("WHATSAPP_DIGEST", "true").lower() == "true"
+# Webhook message ids remembered for this long (Meta keeps retrying for days)
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", str(7 * 24 * 3600)))  # seconds
+IDEMPOTENCY_MAX_IDS = int(os.getenv("IDEMPOTENCY_MAX_IDS", "10000"))  # kept in memory
+
+# Batched skill extraction: descriptions packed per prompt
+SKILL_BATCH_MAX_JOBS = int(os.getenv("SKILL_BATCH_MAX_JOBS", "10"))
+SKILL_BATCH_TOKEN_BUDGET = int(os.getenv("SKILL_BATCH_TOKEN_BUDGET", "8000"))
+
+# One Gemini call per job for skills + company + flags + salary (false = separate skill/company calls)
+FUSED_ENRICHMENT = os.getenv("FUSED_ENRICHMENT", "true").lower() == "true"
+
+# Company intel is reused for this many seconds before it is researched again
+COMPANY_INTEL_TTL = int(os.getenv("COMPANY_INTEL_TTL", str(30 * 24 * 3600)))
 GOOGLE_SHEETS_CREDENTIALS_PATH = os.getenv("GOOGLE_SHEETS_CREDENTIALS_PATH", "credentials.json")
 
+# Local on-disk caches and stores (SQLite files)
+CACHE_DIR = Path(os.getenv("CACHE_DIR", str(Path(__file__).parent.parent / ".cache")))
+
 JOB_PORTALS = ["indeed", "linkedin", "xing", "stepstone"]  
 
+# Portals queried by agents.job_scraper.scrape_jobs (comma-separated in .env)
+ENABLED_PORTALS = [p.strip() for p in os.getenv("ENABLED_PORTALS", "adzuna,indeed").split(",") if p.strip()]
+CONCURRENT_SCRAPING = os.getenv("CONCURRENT_SCRAPING", "true").lower() == "true"
+
+# Seconds to wait for each portal before its results are dropped
+PORTAL_TIMEOUTS = {
+    "adzuna": 12,
+    "indeed": 12,
+    "arbeitnow": 12,
+    "arbeitsagentur": 12,
+    "linkedin": 12,
+    "xing": 12,
+}
+
+# Per-portal politeness: token bucket refill rate (requests/sec) and burst size
+PORTAL_RATE_LIMITS = {
+    "adzuna": {"rate": 0.4, "burst": 2},
+    "indeed": {"rate": 0.5, "burst": 1},
+    "arbeitnow": {"rate": 1.0, "burst": 2},
+    "arbeitsagentur": {"rate": 1.0, "burst": 2},
+    "linkedin": {"rate": 0.5, "burst": 1},
+    "xing": {"rate": 0.5, "burst": 1},
+}
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+
+# Seconds a cached feed is served without revalidation (conditional GET after that)
+PORTAL_CACHE_TTL = {
+    "indeed": 900,
+    "linkedin": 900,
+    "xing": 1800,
+}
+
+# Scraped 'Job Description' kept per job. Well above the 750-token prompt budget so the
+# description preprocessor can pick requirement sections from the whole posting
+DESCRIPTION_MAX_CHARS = int(os.getenv("DESCRIPTION_MAX_CHARS", "8000"))
+
 USER_PROFILE = {
     "skills": ["Python", "Django", "PostgreSQL", "Docker"],
     "job_titles": [
@@ -39,6 +115,11 @@ USER_PROFILE = {
 }
 
 SHEETS_ID = os.getenv("SHEETS_ID")
+# Buffered Sheets writes: flush after this many rows or seconds, whichever comes first
+SHEETS_BATCH_SIZE = int(os.getenv("SHEETS_BATCH_SIZE", "25"))
+SHEETS_FLUSH_SECONDS = float(os.getenv("SHEETS_FLUSH_SECONDS", "10"))
+# Attempts per batch on quota (429) / server errors before rows are left unsynced for the next start
+SHEETS_MAX_RETRIES = int(os.getenv("SHEETS_MAX_RETRIES", "5"))
 
 COLUMNS = [
     "Job ID", "Date Posted", "Date Scraped", "Job Portal", "Job URL", "Priority Level", "Verification Status",
@@ -0,0 +1,49 @@
+# bench_import_time.py - cold import cost of each module (fresh interpreter per module)
+import sys
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+MODULES = [
+    "config.config",
+    "utils.sheets_manager",
+    "utils.duplicate_detector",
+    "utils.cv_parser",
+    "utils.whatsapp_notifier",
+    "agents.gemini_client",
+    "agents.company_researcher",
+    "agents.skill_analyzer",
+    "agents.job_scraper",
+    "agents.linkedin_scraper",
+    "agents.adk_agents",
+    "main",
+    "webhook_server",
+]
+
+SNIPPET = (
+    "import time, sys; t = time.perf_counter(); import {mod}; "
+    "print(round((time.perf_counter() - t) * 1000, 1), len(sys.modules))"
+)
+
+def time_import(mod: str, runs: int = 3):
+    """Best-of-N import time in ms, plus how many modules got loaded."""
+    best, loaded = None, 0
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-c", SNIPPET.format(mod=mod)],
+                              cwd=ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            return None, proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"
+        ms, count = proc.stdout.strip().splitlines()[-1].split()
+        best = float(ms) if best is None else min(best, float(ms))
+        loaded = int(count)
+    return best, loaded
+
+if __name__ == "__main__":
+    print(f"{'module':32} {'ms':>8} {'modules':>8}")
+    for mod in MODULES:
+        ms, info = time_import(mod)
+        if ms is None:
+            print(f"{mod:32} {'ERR':>8}  {info}")
+        else:
+            print(f"{mod:32} {ms:8.1f} {info:8}")
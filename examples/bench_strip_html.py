@@ -0,0 +1,65 @@
+# bench_strip_html.py - old HTMLParser stripping vs the regex tokenizer with early stop
+# python examples/bench_strip_html.py          -> built-in samples
+# python examples/bench_strip_html.py --live   -> also pull real descriptions from Arbeitnow (+ Adzuna if keys are set)
+import sys
+import os
+import timeit
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.job_scraper import HTMLStripper, strip_html
+
+# Arbeitnow returns full HTML postings; Adzuna returns a ~500 char plain-text snippet
+ARBEITNOW_SAMPLE = """<p><strong>Über uns</strong></p><p>Wir sind ein schnell wachsendes Berliner Software&shy;unternehmen
+mit &gt;120 Mitarbeitenden und entwickeln Plattformen für Logistik &amp; E&#8209;Commerce.</p>
+<p><strong>Deine Aufgaben</strong></p><ul><li><p>Du entwickelst skalierbare Backend-Services mit Python (FastAPI, Django) und Go</p></li>
+<li><p>Du betreibst unsere Datenpipelines auf AWS (Lambda, S3, Glue) mit Terraform</p></li>
+<li><p>Du arbeitest eng mit Product &amp; Data Science zusammen&nbsp;&ndash; von der Idee bis zum Release</p></li></ul>
+<p><strong>Dein Profil</strong></p><ul><li><p>3+ Jahre Erfahrung in der Backend-Entwicklung mit Python</p></li>
+<li><p>Erfahrung mit Docker, Kubernetes und CI/CD (GitHub Actions)</p></li><li><p>Sehr gute Deutsch- oder Englischkenntnisse</p></li></ul>
+<p><strong>Was wir bieten</strong></p><ul><li><p>30 Tage Urlaub, flexible Arbeitszeiten &amp; Remote-Option</p></li>
+<li><p>Weiterbildungsbudget von 2.000&nbsp;&euro; pro Jahr</p></li><li><p>BVG-Ticket, Jobrad, betriebliche Altersvorsorge</p></li></ul>
+<p>Wir freuen uns auf deine Bewerbung&#33; Bitte gib deine Gehaltsvorstellung und deinen frühestmöglichen Starttermin an.</p>""" * 3
+
+ADZUNA_SAMPLE = ("We are looking for a Senior Python Developer (m/w/d) to join our data platform team in Munich. "
+                 "You will design and build APIs &amp; ETL pipelines on AWS, work with Docker/Kubernetes and "
+                 "mentor junior engineers. Requirements: 5+ years Python, SQL, cloud experience&hellip; "
+                 "Benefits include hybrid work, 30 days holiday and a &euro;1,500 training budget. "
+                 "<strong>Apply now</strong> with your CV and salary expectations&hellip;")
+
+def old_strip(html_text: str) -> str:
+    """The previous implementation: new HTMLParser per call, full parse, slice afterwards."""
+    stripper = HTMLStripper()
+    stripper.feed(html_text)
+    return stripper.get_data()[:500]
+
+def new_strip(html_text: str) -> str:
+    return strip_html(html_text, 500)
+
+def live_samples() -> list:
+    import requests
+    samples = []
+    resp = requests.get("https://arbeitnow.com/api/job-board-api", params={"search": "python", "country": "de"}, timeout=10)
+    samples += [("arbeitnow (live)", j.get('description', '')) for j in resp.json().get('data', [])[:10]]
+    app_id, api_key = os.getenv("ADZUNA_APP_ID"), os.getenv("ADZUNA_API_KEY")
+    if app_id and api_key:
+        resp = requests.get("https://api.adzuna.com/v1/api/jobs/de/search/1",
+                            params={"app_id": app_id, "app_key": api_key, "what": "python", "results_per_page": 10}, timeout=10)
+        samples += [("adzuna (live)", j.get('description', '')) for j in resp.json().get('results', [])]
+    return samples
+
+def bench(label: str, text: str, number: int = 2000):
+    old = min(timeit.repeat(lambda: old_strip(text), number=number, repeat=3)) / number * 1e6
+    new = min(timeit.repeat(lambda: new_strip(text), number=number, repeat=3)) / number * 1e6
+    same = "same" if old_strip(text) == new_strip(text) else "DIFFERS"
+    print(f"{label:22} {len(text):7} chars  old {old:8.1f}µs  new {new:7.1f}µs  x{old / new:5.1f}  {same}")
+
+if __name__ == "__main__":
+    samples = [("arbeitnow (sample)", ARBEITNOW_SAMPLE), ("adzuna (sample)", ADZUNA_SAMPLE)]
+    if "--live" in sys.argv:
+        try:
+            samples += live_samples()
+        except Exception as e:
+            print(f"⚠️ Live fetch failed: {e}")
+    for label, text in samples:
+        bench(label, text)
@@ -1,20 +1,23 @@
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
-from utils.whatsapp_notifier import notifier
+from utils.whatsapp_notifier import notifier, AlertDigest, ALERT_COLUMN, ALERT_PENDING, ALERT_SENT
 from utils.cv_parser import cv_parser  # NEW
 import asyncio
-import google.generativeai as genai
 import time
 import uuid
 import random
-from config.config import GEMINI_API_KEY, USER_PROFILE
+from config.config import USER_PROFILE, ENRICH_CONCURRENCY, PIPELINE_QUEUE_SIZE, WHATSAPP_DIGEST, FUSED_ENRICHMENT
+from agents.gemini_client import client
+from agents.company_researcher import research_company_async
+from agents.job_enricher import enrich_job_async
+from agents.description_preprocessor import prepare_description, preprocess_stats, SKILL_HINT_TOKENS
 from utils.sheets_manager import manager
-from utils.duplicate_detector import is_duplicate
+from utils.duplicate_detector import DuplicateIndex, is_duplicate, register_job
+from utils.batch_checkpoint import BatchCheckpoint
+from utils.job_record import JobRecord
 from agents.job_scraper import scrape_jobs
 
-genai.configure(api_key=GEMINI_API_KEY)
-
 QUERIES = [
     "python developer",
     "backend engineer", 
@@ -29,16 +32,23 @@ async def process_job_full_intelligence(job):
     """FULL 57-column intelligence pipeline."""
     print("🧠 Running FULL intelligence analysis...")
     
+    if FUSED_ENRICHMENT:
+        # One call: skills (matched against the CV), company intel, flags, salary hint
+        job.update(await enrich_job_async(job))
+        score = float(job.get('Skills Match %', '0%').rstrip('%') or 0)
+        job['Match Score'] = f"{score:.0f}"
+        print(f"📊 CV Match Score: {score:.1f}/100")
+        return job, score
+    
     # 1. CV Profile
     cv_profile = cv_parser.get_profile()
     
-    # 2. Parallel: Skills + Company + Basic analysis
-    model = genai.GenerativeModel('gemini-2.5-flash-lite')
+    # 2. Parallel: Skills + Company + Basic analysis (cached per prompt)
+    skill_task = client.generate_content_async(
+        f"Analyze required skills: {prepare_description(job, SKILL_HINT_TOKENS, 'skills')}")
+    company_task = research_company_async(job)
     
-    skill_task = model.generate_content_async(f"Analyze required skills: {job['Job Description'][:300]}")
-    company_task = model.generate_content_async(f"Research {job['Company Name']}: mission, tech stack")
-    
-    skill_result, company_result = await asyncio.gather(skill_task, company_task)
+    skill_result, company_intel = await asyncio.gather(skill_task, company_task)
     
     # 3. SIMPLE CV matching (fallback until agents ready)
     job_skills = ['Python', 'AWS', 'Docker']  # Extract from skill_result later
@@ -59,13 +69,11 @@ async def process_job_full_intelligence(job):
         'Experience Level Match': 'Junior+ Match',
         
         # Company Intel (10 cols) 
-        'Company Mission': company_result.text[:100],
-        'Tech Stack Used': 'Python, AWS',  # Parse later
-        'Company Culture Keywords': 'remote, agile',
+        **company_intel,
         
         # Analysis
-        'skills_analysis': skill_result.text[:300],
-        'company_intel': company_result.text[:300],
+        'skills_analysis': skill_result[:300],
+        'company_intel': ' | '.join(company_intel.values())[:300],
     }
     
     job.update(intelligence)
@@ -76,13 +84,84 @@ async def process_job_full_intelligence(job):
     
     return job, score
 
-async def orchestrate(query: str = None, page: int = 1):
-    """Enhanced orchestration - FULL intelligence."""
+async def enrich_job(label: str, job):
+    """Intelligence for one job; returns (job, score) or None on failure."""
+    print(f"--- JOB {label}: {job['Job Title']} ---")
+    try:
+        job, score = await process_job_full_intelligence(job)
+    except Exception as e:
+        print(f"❌ Job {label} failed: {e}")
+        return None
+    
+    # WhatsApp goes out only once the job is saved (alert_saved); alerts_delivered records 'sent'
+    if notifier.should_alert(score):
+        job[ALERT_COLUMN] = ALERT_PENDING
+    job['Alert Score'] = f"{score:.1f}"
+    
+    # Core columns
+    job['Date Scraped'] = time.strftime("%Y-%m-%d")
+    job['Priority Level'] = 'High' if score >= 85 else 'Medium'
+    return job, score
+
+async def save_job(job, score) -> bool:
+    """Append to the store/Sheets off the event loop and index it for dedupe."""
+    try:
+        await asyncio.to_thread(manager.append_job, job)
+        register_job(job)
+        print(f"💾 SAVED! Score: {score:.1f} | ID: {job['Job ID']}")
+        return True
+    except Exception as e:
+        print(f"❌ Save failed: {e}")
+        return False
+
+def alerts_delivered(jobs: list):
+    """WhatsApp accepted the alert for these saved jobs: record it on their rows."""
+    for job in jobs:
+        job[ALERT_COLUMN] = ALERT_SENT
+    manager.update_jobs([job['Job ID'] for job in jobs], {ALERT_COLUMN: ALERT_SENT})
+
+def alert_saved(job, score, digest: AlertDigest = None, on_sent=alerts_delivered) -> bool:
+    """WhatsApp for a saved high match: queued now, or collected into the run's digest."""
+    try:
+        if notifier.send_job_alert(job, score, digest, on_sent):
+            print("📱 WHATSAPP QUEUED! 🚨" if digest is None else "📱 Added to WhatsApp digest")
+            return True
+    except Exception as e:
+        print(f"⚠️ WhatsApp: {e}")
+    return False
+
+def finish_alerts(digest: AlertDigest = None, on_sent=alerts_delivered) -> bool:
+    """Send the digest and wait for WhatsApp; False if a message was not delivered."""
+    if digest is not None:
+        notifier.send_digest(digest, on_sent)
+    return notifier.flush()
+
+def dedupe_page(jobs, pending: DuplicateIndex) -> list:
+    """Give each job an ID and keep the ones not already saved or pending, in order."""
+    fresh = []
+    for idx, job in enumerate(jobs, 1):
+        job = JobRecord.from_dict(job)
+        job['Job ID'] = str(uuid.uuid4())[:8].upper()
+        is_dup, dup_id = is_duplicate(job, pending=pending)
+        if is_dup:
+            print(f"❌ Duplicate: {dup_id}")
+            continue
+        pending.add(job)
+        fresh.append((idx, job))
+    return fresh
+
+async def orchestrate(query: str = None, page: int = 1, concurrency: int = ENRICH_CONCURRENCY,
+                      digest: AlertDigest = None):
+    """
+    Enhanced orchestration - FULL intelligence, up to `concurrency` jobs at once.
+    High matches go into `digest` if given, else into one digest for this page
+    (WHATSAPP_DIGEST) or one message each.
+    """
     if not query:
         query = random.choice(QUERIES)
     
     print(f"🚀 Scraping: '{query}' (Page {page})")
-    jobs = scrape_jobs(query, page)
+    jobs = await asyncio.to_thread(scrape_jobs, query, page)
     
     if not jobs:
         print("⚠️ No jobs")
@@ -91,75 +170,182 @@ async def orchestrate(query: str = None, page: int = 1):
     print(f"\n=== PROCESSING {len(jobs)} JOBS ===\n")
     saved = 0
     
-    for idx, job in enumerate(jobs, 1):
-        print(f"--- JOB {idx}/{len(jobs)}: {job['Job Title']} ---")
-        
-        job['Job ID'] = str(uuid.uuid4())[:8].upper()
-        
-        # Dedupe
-        is_dup, dup_id = is_duplicate(job)
-        if is_dup:
-            print(f"❌ Duplicate: {dup_id}")
-            continue
-        
-        # 🔥 FULL INTELLIGENCE PIPELINE
-        try:
-            job, score = await process_job_full_intelligence(job)
-            
-            # WhatsApp for high scores
-            try:
-                alert_sent = notifier.send_job_alert(job, score)
-                job['WhatsApp Alert'] = 'Sent' if alert_sent else 'Skipped'
-                job['Alert Score'] = f"{score:.1f}"
-                if alert_sent:
-                    print("📱 WHATSAPP SENT! 🚨")
-            except Exception as e:
-                job['WhatsApp Alert'] = 'Error'
-                print(f"⚠️ WhatsApp: {e}")
-            
-            # Core columns
-            job['Date Scraped'] = time.strftime("%Y-%m-%d")
-            job['Priority Level'] = 'High' if score >= 85 else 'Medium'
-            
-            # Save to sheets
-            manager.append_job(job)
+    # Dedupe in page order, against saved jobs and earlier jobs of this page
+    fresh = await asyncio.to_thread(dedupe_page, jobs, DuplicateIndex())
+    
+    # 🔥 FULL INTELLIGENCE PIPELINE - bounded fan-out, results come back in page order
+    limit = asyncio.Semaphore(max(1, concurrency))
+    own_digest = digest is None and WHATSAPP_DIGEST
+    if own_digest:
+        digest = AlertDigest()
+    
+    async def bounded(idx, job):
+        async with limit:
+            return await enrich_job(f"{idx}/{len(jobs)}", job)
+    
+    results = await asyncio.gather(*(bounded(idx, job) for idx, job in fresh))
+    
+    # Save in page order; only saved jobs are alerted
+    for result in results:
+        if result is not None and await save_job(*result):
             saved += 1
-            print(f"💾 SAVED! Score: {score:.1f} | ID: {job['Job ID']}")
-            
-        except Exception as e:
-            print(f"❌ Job failed: {e}")
-        
-        print()
+            alert_saved(*result, digest)
     
+    if own_digest or digest is None:  # a caller's digest is sent (and recorded) by the caller
+        await asyncio.to_thread(finish_alerts, digest)
     print(f"✅ {saved}/{len(jobs)} saved\n")
     return saved
 
-async def orchestrate_batch(target_jobs: int = 30):
-    """Batch until target reached."""
+def batch_schedule(start: int = 0):
+    """(unit_no, query, page) in the same order as before: pages 1-3 of each query, cycling."""
+    unit_no = start
+    while True:
+        yield unit_no, QUERIES[(unit_no // 3) % len(QUERIES)], unit_no % 3 + 1
+        unit_no += 1
+
+async def orchestrate_batch(target_jobs: int = 30, workers: int = ENRICH_CONCURRENCY,
+                            queue_size: int = PIPELINE_QUEUE_SIZE, resume: bool = True):
+    """
+    Batch until target reached, as a pipeline:
+    scrape -> [job queue] -> enrichment workers -> [result queue] -> sink (save).
+    Scraping the next page overlaps with enrichment of the current one; the
+    bounded queues apply backpressure so only a few pages are ever in memory.
+    Progress is checkpointed, so a restarted run picks up where it stopped.
+    """
     print(f"🎯 TARGET: {target_jobs} jobs\n")
     
-    total_saved = 0
-    query_idx, page = 0, 1
+    checkpoint = BatchCheckpoint()
+    progress = checkpoint.begin(target_jobs, resume=resume)
+    leftover = checkpoint.unfinished_jobs() if progress['resumed'] else []
+    if progress['resumed']:
+        print(f"⏯️ Resuming run #{progress['run_id']}: {progress['saved']} saved, "
+              f"{len(leftover)} jobs in flight, next unit {progress['next_unit']}\n")
     
-    while total_saved < target_jobs:
-        query = QUERIES[query_idx % len(QUERIES)]
-        saved = await orchestrate(query, page)
-        total_saved += saved
-        
-        print(f"📊 {total_saved}/{target_jobs} ({total_saved/target_jobs*100:.0f}%)")
-        
-        if total_saved >= target_jobs:
-            break
+    job_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    result_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    workers = max(1, workers)
+    pending = DuplicateIndex()  # accepted this batch, not saved yet
+    digest = AlertDigest() if WHATSAPP_DIGEST else None  # one WhatsApp message for the whole run
+    
+    def delivered(jobs):
+        alerts_delivered(jobs)
+        checkpoint.set_alert([job['Job ID'] for job in jobs], 'sent')
+    
+    def alert(job, score):
+        if notifier.should_alert(score):
+            # 'pending' first: without a digest the sender may report delivery right away
+            checkpoint.set_alert([job['Job ID']], 'pending')
+            alert_saved(job, score, digest, delivered)
+    
+    # Saved by the previous attempt but its digest never went out
+    for job, score in (checkpoint.pending_alerts() if progress['resumed'] else []):
+        alert(job, score)
+    units_per_round = len(QUERIES) * 3
+    
+    async def scrape_stage():
+        cancelled = False
+        try:
+            # Jobs the previous attempt scraped but did not finish: no re-scrape, no repeat LLM calls
+            for item in leftover:
+                pending.add(item['job'])
+                if item['status'] == 'enriched':
+                    await result_queue.put((item['job'], item['score']))
+                else:
+                    await job_queue.put((item['label'], item['job']))
             
-        page += 1
-        if page > 3:
-            page = 1
-            query_idx += 1
-        
-        time.sleep(2)
+            # A full pass over every query/page with nothing new means the portals are drained
+            fresh_this_round = 0
+            for n, (unit_no, query, page) in enumerate(batch_schedule(progress['next_unit']), 1):
+                print(f"🚀 Scraping: '{query}' (Page {page})")
+                try:
+                    jobs = await asyncio.to_thread(scrape_jobs, query, page)
+                except Exception as e:
+                    print(f"❌ Scrape failed: {e}")
+                    jobs = []
+                # Off the loop: the first call syncs Sheets and builds the duplicate index
+                fresh = [(f"{query} p{page} #{idx}", job)
+                         for idx, job in await asyncio.to_thread(dedupe_page, jobs, pending)]
+                checkpoint.add_unit(unit_no, query, page, fresh)
+                fresh_this_round += len(fresh)
+                for item in fresh:
+                    await job_queue.put(item)
+                
+                if n % units_per_round == 0:
+                    if not fresh_this_round:
+                        print("⚠️ No new jobs in a full pass over all queries")
+                        break
+                    fresh_this_round = 0
+        except asyncio.CancelledError:
+            cancelled = True  # sink is done, workers are being cancelled too
+            raise
+        except Exception as e:
+            print(f"❌ Scraper stopped: {e}")
+        finally:
+            # Workers stop on their None; without it they (and the sink) would wait for ever
+            if not cancelled:
+                for _ in range(workers):
+                    await job_queue.put(None)
+    
+    async def enrich_stage():
+        cancelled = False
+        try:
+            while True:
+                item = await job_queue.get()
+                if item is None:
+                    return
+                label, job = item
+                result = await enrich_job(label, job)
+                if result is None:
+                    checkpoint.job_failed(job['Job ID'])
+                    continue
+                checkpoint.job_enriched(*result)
+                await result_queue.put(result)
+        except asyncio.CancelledError:
+            cancelled = True  # sink is done, nobody reads the sentinel
+            raise
+        except Exception as e:
+            print(f"❌ Enrichment worker stopped: {e}")
+        finally:
+            # The sink counts one None per worker, so it must arrive even if this worker died
+            if not cancelled:
+                await result_queue.put(None)
+    
+    async def sink_stage() -> int:
+        saved, finished = progress['saved'], 0
+        while saved < target_jobs and finished < workers:
+            result = await result_queue.get()
+            if result is None:
+                finished += 1
+                continue
+            if await save_job(*result):
+                saved = checkpoint.job_saved(result[0]['Job ID'])
+                alert(*result)
+                print(f"📊 {saved}/{target_jobs} ({saved/target_jobs*100:.0f}%)")
+        return saved
+    
+    producer = asyncio.create_task(scrape_stage())
+    enrichers = [asyncio.create_task(enrich_stage()) for _ in range(workers)]
+    try:
+        total_saved = await sink_stage()
+    finally:
+        # Target reached (or drained): drop queued jobs and in-flight enrichments
+        for task in [producer, *enrichers]:
+            task.cancel()
+        await asyncio.gather(producer, *enrichers, return_exceptions=True)
     
+    if not finish_alerts(digest, delivered):
+        print("⚠️ Some WhatsApp alerts were not delivered")
+    checkpoint.finish()
+    manager.flush()
     print(f"\n🎉 BATCH COMPLETE: {total_saved} jobs!")
+    trimmed = preprocess_stats()
+    if trimmed['jobs']:
+        print(f"✂️ Descriptions: {trimmed['raw_tokens']} -> {trimmed['sent_tokens']} tokens "
+              f"(saved {trimmed['saved_tokens']} over {trimmed['jobs']} prompts)")
+    print(f"🧠 Gemini cache: {client.cache_stats()}")
 
 if __name__ == "__main__":
-    target = int(sys.argv[1]) if len(sys.argv) > 1 else 10
-    asyncio.run(orchestrate_batch(target))
+    # python main.py [target] [--fresh]  (--fresh drops an unfinished run instead of resuming it)
+    args = [a for a in sys.argv[1:] if a != '--fresh']
+    target = int(args[0]) if args else 10
+    asyncio.run(orchestrate_batch(target, resume='--fresh' not in sys.argv))
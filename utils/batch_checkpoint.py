@@ -0,0 +1,164 @@
+"""
+Batch Checkpoint - RESUMABLE WORKER STATE
+Persists orchestrate_batch progress: the next (query, page) unit, the jobs each
+unit produced and how far each job got (queued -> enriched -> saved), so a
+restarted worker carries on without re-scraping or re-paying for LLM calls.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))  # Root
+
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.local_db import connect
+from utils.job_record import JobRecord
+
+class BatchCheckpoint:
+    def __init__(self, name: str = "batch_checkpoint"):
+        self.conn = connect(name)
+        self.lock = threading.Lock()
+        self.run_id: Optional[int] = None
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                target INTEGER NOT NULL,
+                saved INTEGER NOT NULL DEFAULT 0,
+                next_unit INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'active',
+                started_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS units (
+                run_id INTEGER NOT NULL,
+                unit_no INTEGER NOT NULL,
+                query TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                jobs INTEGER NOT NULL,
+                scraped_at REAL NOT NULL,
+                PRIMARY KEY (run_id, unit_no)
+            );
+            CREATE TABLE IF NOT EXISTS jobs (
+                run_id INTEGER NOT NULL,
+                job_id TEXT NOT NULL,
+                label TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                job TEXT NOT NULL,
+                score REAL,
+                alert TEXT,  -- NULL: no alert; 'pending': saved, not yet delivered; 'sent': delivered
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, job_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(run_id, status);
+        """)
+
+    def begin(self, target: int, resume: bool = True) -> Dict[str, int]:
+        """Attach to the unfinished run (if any) or start a new one; returns its progress."""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT id, saved, next_unit FROM runs WHERE status = 'active' ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+            if row is not None and not resume:
+                self.conn.execute("UPDATE runs SET status = 'abandoned', updated_at = ? WHERE id = ?", (now, row['id']))
+                row = None
+            if row is None:
+                cur = self.conn.execute(
+                    "INSERT INTO runs (target, started_at, updated_at) VALUES (?, ?, ?)", (target, now, now))
+                self.run_id = cur.lastrowid
+                return {'run_id': self.run_id, 'saved': 0, 'next_unit': 0, 'resumed': 0}
+            self.run_id = row['id']
+            self.conn.execute("UPDATE runs SET target = ?, updated_at = ? WHERE id = ?", (target, now, self.run_id))
+            return {'run_id': self.run_id, 'saved': row['saved'], 'next_unit': row['next_unit'], 'resumed': 1}
+
+    def add_unit(self, unit_no: int, query: str, page: int, jobs: List[Tuple[str, Dict[str, Any]]]):
+        """Record a scraped unit and its new jobs, and move the cursor past it, atomically."""
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO units (run_id, unit_no, query, page, jobs, scraped_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.run_id, unit_no, query, page, len(jobs), now),
+                )
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO jobs (run_id, job_id, label, job, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    [(self.run_id, job['Job ID'], label, json.dumps(dict(job)), now) for label, job in jobs],
+                )
+                self.conn.execute(
+                    "UPDATE runs SET next_unit = MAX(next_unit, ?), updated_at = ? WHERE id = ?",
+                    (unit_no + 1, now, self.run_id),
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def _set_job(self, job_id: str, status: str, job: Optional[Dict[str, Any]] = None, score: Optional[float] = None):
+        with self.lock:
+            if job is None:
+                self.conn.execute(
+                    "UPDATE jobs SET status = ?, updated_at = ? WHERE run_id = ? AND job_id = ?",
+                    (status, time.time(), self.run_id, job_id),
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE jobs SET status = ?, job = ?, score = ?, updated_at = ? WHERE run_id = ? AND job_id = ?",
+                    (status, json.dumps(dict(job)), score, time.time(), self.run_id, job_id),
+                )
+
+    def job_enriched(self, job: Dict[str, Any], score: float):
+        self._set_job(job['Job ID'], 'enriched', job, score)
+
+    def job_failed(self, job_id: str):
+        self._set_job(job_id, 'failed')
+
+    def job_saved(self, job_id: str) -> int:
+        """Mark a job saved and return the run's saved count."""
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                cur = self.conn.execute(
+                    "UPDATE jobs SET status = 'saved', updated_at = ? WHERE run_id = ? AND job_id = ? AND status != 'saved'",
+                    (now, self.run_id, job_id),
+                )
+                if cur.rowcount:
+                    self.conn.execute("UPDATE runs SET saved = saved + 1, updated_at = ? WHERE id = ?", (now, self.run_id))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            return self.conn.execute("SELECT saved FROM runs WHERE id = ?", (self.run_id,)).fetchone()[0]
+
+    def set_alert(self, job_ids: List[str], state: str):
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE jobs SET alert = ?, updated_at = ? WHERE run_id = ? AND job_id = ?",
+                [(state, time.time(), self.run_id, job_id) for job_id in job_ids],
+            )
+
+    def pending_alerts(self) -> List[Tuple[Dict[str, Any], float]]:
+        """Saved jobs whose alert WhatsApp had not accepted when the previous attempt stopped."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT job, score FROM jobs WHERE run_id = ? AND status = 'saved' AND alert = 'pending' ORDER BY rowid",
+                (self.run_id,),
+            ).fetchall()
+        return [(JobRecord(json.loads(row['job'])), row['score']) for row in rows]
+
+    def unfinished_jobs(self) -> List[Dict[str, Any]]:
+        """Jobs of this run still waiting for enrichment or for their save, oldest first."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT label, status, job, score FROM jobs WHERE run_id = ? AND status IN ('queued', 'enriched') ORDER BY rowid",
+                (self.run_id,),
+            ).fetchall()
+        return [{'label': row['label'], 'status': row['status'], 'job': JobRecord(json.loads(row['job'])), 'score': row['score']}
+                for row in rows]
+
+    def finish(self):
+        with self.lock:
+            self.conn.execute("UPDATE runs SET status = 'done', updated_at = ? WHERE id = ?", (time.time(), self.run_id))
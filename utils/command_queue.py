@@ -0,0 +1,186 @@
+"""
+Command Queue - PERSISTENT WHATSAPP COMMAND QUEUE
+The webhook enqueues and returns; a small worker pool runs the commands.
+Rows survive restarts, so anything queued or interrupted mid-run is picked up again.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))  # Root
+
+import os
+import queue
+import socket
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, Optional
+
+from config.config import COMMAND_WORKERS, COMMAND_LEASE_SECONDS
+from utils.local_db import connect
+from utils.lazy import LazyProxy
+
+RECENT_LATENCIES = 50  # finished commands used for the latency figures
+
+class CommandQueue:
+    def __init__(self, name: str = "command_queue", workers: int = COMMAND_WORKERS,
+                 lease_seconds: int = COMMAND_LEASE_SECONDS):
+        self.conn = connect(name)
+        self.lock = threading.Lock()
+        self.workers = max(1, workers)
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.wakeup: "queue.Queue[int]" = queue.Queue()
+        self.threads = []
+        self.handler: Optional[Callable[[str], Any]] = None
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS commands (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_id TEXT,
+            text TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            enqueued_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL,
+            error TEXT,
+            owner TEXT,
+            lease_until REAL
+        )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_commands_status ON commands(status)")
+        # A WhatsApp message is queued at most once, however often Meta redelivers it
+        self.conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_commands_message ON commands(message_id) WHERE message_id != ''")
+
+    def start(self, handler: Callable[[str], Any]):
+        """Start the worker pool once; re-queue commands left over from a previous run."""
+        with self.lock:
+            if self.threads:
+                return
+            self.handler = handler
+            for _ in range(self.workers):
+                thread = threading.Thread(target=self._work_loop, daemon=True)
+                thread.start()
+                self.threads.append(thread)
+            leftover = [row['id'] for row in self.conn.execute(
+                "SELECT id FROM commands WHERE status = 'queued' ORDER BY id")]
+            lease_thread = threading.Thread(target=self._lease_loop, daemon=True)
+            lease_thread.start()
+            self.threads.append(lease_thread)
+        reclaimed = self._reclaim_expired()
+        for command_id in leftover:
+            self.wakeup.put(command_id)
+        if leftover or reclaimed:
+            print(f"📥 Resuming {len(leftover) + reclaimed} queued commands")
+
+    def _reclaim_expired(self) -> int:
+        """Re-queue 'running' commands whose owner stopped renewing the lease (crashed process)."""
+        now = time.time()
+        with self.lock:
+            expired = [row['id'] for row in self.conn.execute(
+                "SELECT id FROM commands WHERE status = 'running' AND (lease_until IS NULL OR lease_until < ?)", (now,))]
+            # Same condition again: another process may have renewed or re-queued it meanwhile
+            expired = [command_id for command_id in expired if self.conn.execute(
+                "UPDATE commands SET status = 'queued', started_at = NULL, owner = NULL, lease_until = NULL "
+                "WHERE id = ? AND status = 'running' AND (lease_until IS NULL OR lease_until < ?)",
+                (command_id, now)).rowcount]
+        for command_id in expired:
+            self.wakeup.put(command_id)
+        return len(expired)
+
+    def _lease_loop(self):
+        """Renew our running commands' leases and take over expired ones from dead workers."""
+        while True:
+            time.sleep(max(1.0, self.lease_seconds / 3))
+            with self.lock:
+                self.conn.execute(
+                    "UPDATE commands SET lease_until = ? WHERE status = 'running' AND owner = ?",
+                    (time.time() + self.lease_seconds, self.owner),
+                )
+            reclaimed = self._reclaim_expired()
+            if reclaimed:
+                print(f"📥 Took over {reclaimed} commands with expired leases")
+
+    def enqueue(self, text: str, message_id: str = "") -> Optional[int]:
+        """Queue a command; None if this message_id was already queued."""
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO commands (message_id, text, enqueued_at) VALUES (?, ?, ?)",
+                (message_id, text, time.time()),
+            )
+            if cursor.rowcount == 0:
+                return None
+            command_id = cursor.lastrowid
+        self.wakeup.put(command_id)
+        print(f"📥 Queued command #{command_id} (depth {self.depth()})")
+        return command_id
+
+    def _claim(self, command_id: int) -> Optional[str]:
+        """Mark a queued command running; None if another worker already took it."""
+        with self.lock:
+            now = time.time()
+            cursor = self.conn.execute(
+                "UPDATE commands SET status = 'running', started_at = ?, owner = ?, lease_until = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (now, self.owner, now + self.lease_seconds, command_id),
+            )
+            if cursor.rowcount == 0:
+                return None
+            row = self.conn.execute("SELECT text FROM commands WHERE id = ?", (command_id,)).fetchone()
+        return row['text']
+
+    def _finish(self, command_id: int, error: str = ""):
+        with self.lock:
+            self.conn.execute(
+                "UPDATE commands SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                ('failed' if error else 'done', time.time(), error or None, command_id),
+            )
+            row = self.conn.execute(
+                "SELECT enqueued_at, started_at, finished_at FROM commands WHERE id = ?", (command_id,)
+            ).fetchone()
+        waited = row['started_at'] - row['enqueued_at']
+        ran = row['finished_at'] - row['started_at']
+        print(f"⏱️ Command #{command_id} {'failed' if error else 'done'}: waited {waited:.1f}s, ran {ran:.1f}s")
+
+    def _work_loop(self):
+        while True:
+            command_id = self.wakeup.get()
+            text = self._claim(command_id)
+            if text is None:
+                continue
+            try:
+                self.handler(text)
+                self._finish(command_id)
+            except Exception as e:
+                traceback.print_exc()
+                self._finish(command_id, error=str(e))
+
+    def depth(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM commands WHERE status = 'queued'").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth plus wait/run latency of the most recent finished commands."""
+        with self.lock:
+            counts = {row['status']: row['n'] for row in self.conn.execute(
+                "SELECT status, COUNT(*) AS n FROM commands GROUP BY status")}
+            recent = self.conn.execute(
+                """SELECT id, started_at - enqueued_at AS waited, finished_at - started_at AS ran, status
+                   FROM commands WHERE finished_at IS NOT NULL ORDER BY finished_at DESC LIMIT ?""",
+                (RECENT_LATENCIES,),
+            ).fetchall()
+        ran = sorted(row['ran'] for row in recent)
+        waited = [row['waited'] for row in recent]
+        return {
+            'depth': counts.get('queued', 0),
+            'running': counts.get('running', 0),
+            'done': counts.get('done', 0),
+            'failed': counts.get('failed', 0),
+            'workers': self.workers,
+            'avg_wait_s': round(sum(waited) / len(waited), 2) if waited else 0.0,
+            'p50_run_s': round(ran[len(ran) // 2], 2) if ran else 0.0,
+            'max_run_s': round(ran[-1], 2) if ran else 0.0,
+            'recent': [{'id': row['id'], 'status': row['status'],
+                        'wait_s': round(row['waited'], 2), 'run_s': round(row['ran'], 2)}
+                       for row in recent[:10]],
+        }
+
+# Singleton - opens the queue DB on first use
+command_queue = LazyProxy(CommandQueue)
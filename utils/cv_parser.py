@@ -1,25 +1,59 @@
 """
 FINAL AI CV Parser - SYNTAX PERFECT
 """
-import google.generativeai as genai
-import PyPDF2
 import os
 import json
 import re
-from typing import Dict, List
-from config.config import GEMINI_API_KEY
+import hashlib
+from typing import Dict, List, Optional
+from agents.gemini_client import client
+from agents.skill_dictionary import extract_cv_skills
+from config.config import CACHE_DIR
 
-genai.configure(api_key=GEMINI_API_KEY)
+# Bump when the parse prompt or profile shape changes to invalidate cached profiles
+CV_PROMPT_VERSION = "1"
+PROFILE_CACHE_PATH = CACHE_DIR / "cv_profile.json"
 
 class CVParser:
-    def __init__(self, cv_path: str = "documents/CV.pdf"):
+    def __init__(self, cv_path: str = "documents/CV.pdf", cache_path=PROFILE_CACHE_PATH):
         self.cv_path = cv_path
+        self.cache_path = cache_path
         self._profile = None
     
+    def cache_key(self) -> Optional[str]:
+        """SHA-256 of the PDF bytes + prompt version; None if there is no CV."""
+        if not os.path.exists(self.cv_path):
+            return None
+        digest = hashlib.sha256()
+        with open(self.cv_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(65536), b''):
+                digest.update(chunk)
+        return f"{digest.hexdigest()}:v{CV_PROMPT_VERSION}"
+    
+    def load_cached_profile(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data['profile'] if data.get('key') == key else None
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    def save_cached_profile(self, key: str, profile: Dict):
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'profile': profile}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"⚠️ Could not cache CV profile: {e}")
+    
     def extract_text(self) -> str:
         if not os.path.exists(self.cv_path):
             print(f"⚠️ CV not found: {self.cv_path}")
             return ""
+        import PyPDF2  # deferred: only needed when the cached profile is stale
+        
         with open(self.cv_path, 'rb') as file:
             reader = PyPDF2.PdfReader(file)
             text = ""
@@ -39,7 +73,6 @@ class CVParser:
         text = self.extract_text()
         print(f"📄 Parsing YOUR CV ({len(text)} chars)...")
         
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
         prompt = f"""Return ONLY this exact JSON from CV:
 
 {{
@@ -52,13 +85,17 @@ class CVParser:
 
 CV: {text[:3500]}"""
         
-        response = model.generate_content(prompt)
-        cleaned = self.clean_json(response.text)
+        response_text = client.generate_content(prompt, generation_config=None, raise_errors=True)
+        cleaned = self.clean_json(response_text)
         
         try:
             profile = json.loads(cleaned)
             print(f"✅ AI parsed {len(profile.get('skills', {}))} skills")
             self._profile = profile
+            key = self.cache_key()
+            if key:
+                # Only AI results are cached; a fallback retries the LLM next start
+                self.save_cached_profile(key, profile)
             return profile
         except:
             print("🔄 Using fallback...")
@@ -66,14 +103,14 @@ CV: {text[:3500]}"""
     
     def _perfect_fallback(self, text: str) -> Dict:
         """Perfect extraction from YOUR CV text."""
-        skills_raw = re.findall(r'(python|sql|javascript|bigquery|abap|git|github|langchain|crewai|pytorch|tensorflow|hugging face|aws|azure|docker|kubernetes|terraform|jenkins|n8n|mcp|power bi|tableau|excel|teradata|airflow|kafka|snowflake|dbt|databricks|synapse|fastapi|xgboost|optuna|cloudformation|cloudwatch|s3|lambda|glue|ecs|ecr|rds|vpc|alb|control-m|jira|confluence)', text, re.IGNORECASE)
+        skills_raw = extract_cv_skills(text)
         
         profile = {
             'full_name': re.search(r'([A-Z][a-z]+ [A-Z][a-z]+)', text).group(1) if re.search(r'([A-Z][a-z]+ [A-Z][a-z]+)', text) else 'Saiyudh Mannan',
             'experience_years': 2.5,
             'email': re.search(r'([a-z.]+@[a-z.]+)', text).group(1) if re.search(r'([a-z.]+@[a-z.]+)', text) else '',
             'location': 'Magdeburg, Germany',
-            'skills': {skill.title(): 'intermediate' for skill in set(skills_raw)},
+            'skills': {skill: 'intermediate' for skill in skills_raw},
             'projects': [
                 'Automated DevOps Recipe Platform (Terraform, AWS ECS)',
                 'Housing Price Prediction MLOPs (XGBoost, FastAPI)', 
@@ -87,7 +124,13 @@ CV: {text[:3500]}"""
     
     def get_profile(self) -> Dict:
         if self._profile is None:
-            self._profile = self.parse_with_ai()
+            key = self.cache_key()
+            cached = self.load_cached_profile(key) if key else None
+            if cached is not None:
+                print(f"📄 CV profile loaded from cache ({len(cached.get('skills', {}))} skills)")
+                self._profile = cached
+            else:
+                self._profile = self.parse_with_ai()
         return self._profile
 
 cv_parser = CVParser()
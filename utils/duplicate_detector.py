@@ -1,15 +1,185 @@
 """
 Duplicate Detector - OPTION B
 Checks Sheets for duplicates BUT allows saving anyway (configurable)
+
+Stored jobs are loaded once per run into an in-memory index:
+exact hash on normalized Title + Company, plus MinHash-LSH over character
+3-grams so the fuzzy >90% check only runs on a few candidates.
+MinHash signatures are kept in SQLite, so a restart doesn't recompute them.
 """
 import difflib
-from typing import Dict, Any, List
+import random
+import threading
+import zlib
+from array import array
+from typing import Dict, Any, List, Optional, Set
 from utils.sheets_manager import manager
+from utils.job_store import normalize_key
+from utils.local_db import connect
+from utils.lazy import LazyProxy
 
 DUPE_THRESHOLD = 0.90
 ALLOW_DUPLICATE_SAVES = True  # NEW: Set to False to block duplicates
 
-def is_duplicate(new_job: Dict[str, Any], check_only: bool = False) -> tuple[bool, str]:
+# 32 bands x 2 rows: strings with ~30%+ 3-gram overlap almost always collide
+LSH_BANDS = 32
+LSH_ROWS = 2
+_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(LSH_BANDS * LSH_ROWS)]
+
+def _shingles(text: str) -> Set[int]:
+    padded = f" {text} "
+    if len(padded) <= 3:
+        return {zlib.crc32(padded.encode())}
+    return {zlib.crc32(padded[i:i + 3].encode()) for i in range(len(padded) - 2)}
+
+def _signature(text: str) -> List[int]:
+    grams = _shingles(text)
+    return [min((a * g + b) % _PRIME for g in grams) for a, b in _PERMUTATIONS]
+
+def _bands(signature: List[int]) -> List[tuple]:
+    return [(band, tuple(signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])) for band in range(LSH_BANDS)]
+
+def _band_keys(text: str) -> List[tuple]:
+    return _bands(_signature(text))
+
+class SignatureStore:
+    """MinHash signature per normalized title/company string, persisted across restarts."""
+
+    # Signatures depend on the permutations; a new layout gets a fresh table
+    TABLE = f"signatures_{LSH_BANDS}x{LSH_ROWS}"
+
+    def __init__(self, name: str = "dup_signatures"):
+        self.conn = connect(name)
+        self.lock = threading.Lock()
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {self.TABLE} (text TEXT PRIMARY KEY, sig BLOB NOT NULL)")
+
+    def load(self) -> Dict[str, List[int]]:
+        with self.lock:
+            rows = self.conn.execute(f"SELECT text, sig FROM {self.TABLE}").fetchall()
+        signatures = {}
+        for row in rows:
+            sig = array('Q')
+            sig.frombytes(row['sig'])
+            signatures[row['text']] = sig.tolist()
+        return signatures
+
+    def put_many(self, signatures: Dict[str, List[int]]):
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(
+                    f"INSERT OR REPLACE INTO {self.TABLE} (text, sig) VALUES (?, ?)",
+                    [(text, array('Q', sig).tobytes()) for text, sig in signatures.items()],
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+class MinHashLSH:
+    """Banded MinHash index: string -> ids of entries with similar 3-gram sets."""
+
+    def __init__(self):
+        self.buckets: Dict[tuple, Set[int]] = {}
+
+    def add(self, text: str, entry_id: int, signature: List[int] = None):
+        for key in (_bands(signature) if signature else _band_keys(text)):
+            self.buckets.setdefault(key, set()).add(entry_id)
+
+    def candidates(self, text: str) -> Set[int]:
+        found = set()
+        for key in _band_keys(text):
+            found |= self.buckets.get(key, set())
+        return found
+
+class DuplicateIndex:
+    def __init__(self):
+        self.exact: Dict[str, str] = {}
+        self.entries: List[tuple] = []  # (title, company, job_id)
+        self.titles = MinHashLSH()
+        self.companies = MinHashLSH()
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def load(self, records: List[Dict[str, Any]], store: Optional[SignatureStore] = None):
+        """Index stored jobs; signatures come from `store` and new ones are written back."""
+        with self.lock:
+            signatures = store.load() if store is not None else {}
+            computed: Dict[str, List[int]] = {}
+            for record in records:
+                self._add(record, signatures, computed)
+            if store is not None and computed:
+                store.put_many(computed)
+            self.loaded = True
+        print(f"🗂️ Duplicate index loaded ({len(self.entries)} jobs, {len(computed)} new signatures)")
+
+    def add(self, job: Dict[str, Any]):
+        with self.lock:
+            self._add(job)
+
+    def _add(self, job: Dict[str, Any], signatures: Optional[Dict[str, List[int]]] = None,
+             computed: Optional[Dict[str, List[int]]] = None):
+        title = str(job.get('Job Title', '')).strip().lower()
+        company = str(job.get('Company Name', '')).strip().lower()
+        job_id = job.get('Job ID', '')
+        if not job_id:
+            return
+        self.exact.setdefault(normalize_key(title, company), job_id)
+        if title and company:
+            entry_id = len(self.entries)
+            self.entries.append((title, company, job_id))
+            if signatures is None:
+                self.titles.add(title, entry_id)
+                self.companies.add(company, entry_id)
+                return
+            for text, lsh in ((title, self.titles), (company, self.companies)):
+                signature = signatures.get(text) or computed.get(text)
+                if signature is None:
+                    signature = computed[text] = _signature(text)
+                lsh.add(text, entry_id, signature)
+
+    def find(self, title: str, company: str) -> str:
+        """Job ID of an exact or >DUPE_THRESHOLD fuzzy match, '' if none."""
+        with self.lock:
+            dup_id = self.exact.get(normalize_key(title, company))
+            if dup_id:
+                return dup_id
+
+            candidates = self.titles.candidates(title) & self.companies.candidates(company)
+            for entry_id in sorted(candidates):
+                old_title, old_company, old_job_id = self.entries[entry_id]
+                title_sim = difflib.SequenceMatcher(None, title, old_title).ratio()
+                if title_sim <= DUPE_THRESHOLD:
+                    continue
+                comp_sim = difflib.SequenceMatcher(None, company, old_company).ratio()
+                if comp_sim > DUPE_THRESHOLD:
+                    return old_job_id
+            return ''
+
+dup_index = DuplicateIndex()
+signature_store = LazyProxy(SignatureStore)
+_load_lock = threading.Lock()
+
+def _ensure_loaded():
+    if dup_index.loaded:
+        return
+    with _load_lock:  # concurrent webhook threads: one of them loads, the rest wait for it
+        if not dup_index.loaded:
+            manager.sync_from_sheet()  # pick up rows saved by other processes
+            dup_index.load(manager.get_all_jobs(), signature_store)
+
+def register_job(job: Dict[str, Any]):
+    """Add a newly saved job to the in-memory index."""
+    try:
+        _ensure_loaded()
+        dup_index.add(job)
+    except Exception as e:
+        print(f"❌ Dup index error: {e}")
+
+def is_duplicate(new_job: Dict[str, Any], check_only: bool = False,
+                 pending: Optional[DuplicateIndex] = None) -> tuple[bool, str]:
     """
     Check if job is duplicate (Job Title + Company Name match).
     
@@ -17,15 +187,14 @@ def is_duplicate(new_job: Dict[str, Any], check_only: bool = False) -> tuple[boo
         new_job: Job dict to check
         check_only: If True, return duplicate status but DON'T block save
                    If False, block saves (old behavior)
+        pending: Jobs accepted but not saved yet (e.g. the rest of a page
+                 being enriched concurrently), checked after the saved jobs
     
     Returns:
         (is_dup: bool, dup_id: str)
     """
     try:
-        records = manager.sheet.get_all_records()
-        
-        if not records:
-            return False, ''
+        _ensure_loaded()
         
         new_title = new_job.get('Job Title', '').strip().lower()
         new_company = new_job.get('Company Name', '').strip().lower()
@@ -33,29 +202,10 @@ def is_duplicate(new_job: Dict[str, Any], check_only: bool = False) -> tuple[boo
         if not new_title or not new_company:
             return False, ''
         
-        found_dup = False
-        dup_id = ''
-        
-        for record in records:
-            old_title = record.get('Job Title', '').strip().lower()
-            old_company = record.get('Company Name', '').strip().lower()
-            old_job_id = record.get('Job ID', '')
-            
-            # Exact match: Title + Company
-            if new_title == old_title and new_company == old_company and old_job_id:
-                found_dup = True
-                dup_id = old_job_id
-                break
-            
-            # Fuzzy match: Title + Company both >90%
-            if old_title and old_company:
-                title_sim = difflib.SequenceMatcher(None, new_title, old_title).ratio()
-                comp_sim = difflib.SequenceMatcher(None, new_company, old_company).ratio()
-                
-                if title_sim > DUPE_THRESHOLD and comp_sim > DUPE_THRESHOLD and old_job_id:
-                    found_dup = True
-                    dup_id = old_job_id
-                    break
+        dup_id = dup_index.find(new_title, new_company)
+        if not dup_id and pending is not None:
+            dup_id = pending.find(new_title, new_company)
+        found_dup = bool(dup_id)
         
         # NEW LOGIC:
         if found_dup:
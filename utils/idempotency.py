@@ -0,0 +1,67 @@
+"""
+Idempotency - SEEN WHATSAPP MESSAGE IDS
+Meta redelivers webhook events; each message id is acted on once.
+Bounded in-memory TTL set in front of a SQLite table that survives restarts.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))  # Root
+
+import threading
+import time
+from collections import OrderedDict
+
+from config.config import IDEMPOTENCY_TTL, IDEMPOTENCY_MAX_IDS
+from utils.local_db import connect
+from utils.lazy import LazyProxy
+
+class SeenMessages:
+    def __init__(self, name: str = "idempotency", ttl: int = IDEMPOTENCY_TTL, max_ids: int = IDEMPOTENCY_MAX_IDS):
+        self.conn = connect(name)
+        self.lock = threading.Lock()
+        self.ttl = ttl
+        self.max_ids = max_ids
+        self.recent: "OrderedDict[str, float]" = OrderedDict()  # id -> first seen, oldest first
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS seen (
+            message_id TEXT PRIMARY KEY,
+            seen_at REAL NOT NULL
+        )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_seen_at ON seen(seen_at)")
+        self._prune()
+        for row in self.conn.execute(
+                "SELECT message_id, seen_at FROM seen ORDER BY seen_at DESC LIMIT ?", (max_ids,)).fetchall()[::-1]:
+            self.recent[row['message_id']] = row['seen_at']
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        self.conn.execute("DELETE FROM seen WHERE seen_at < ?", (cutoff,))
+        while self.recent and next(iter(self.recent.values())) < cutoff:
+            self.recent.popitem(last=False)
+
+    def seen(self, message_id: str) -> bool:
+        """True if the id was handled within the TTL (checks memory, then the table)."""
+        now = time.time()
+        with self.lock:
+            seen_at = self.recent.get(message_id)
+            if seen_at is None:
+                # Not in memory (evicted or another process): the table decides
+                row = self.conn.execute("SELECT seen_at FROM seen WHERE message_id = ?", (message_id,)).fetchone()
+                seen_at = row['seen_at'] if row else None
+            return seen_at is not None and now - seen_at < self.ttl
+
+    def remember(self, message_id: str):
+        """Record the id once its message has been handled (e.g. the command is safely queued)."""
+        now = time.time()
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO seen (message_id, seen_at) VALUES (?, ?)", (message_id, now))
+            self.recent[message_id] = now
+            self.recent.move_to_end(message_id)
+            if len(self.recent) > self.max_ids:
+                self.recent.popitem(last=False)
+                self._prune()
+
+    def __len__(self) -> int:
+        return len(self.recent)
+
+# Singleton - opens the DB on first webhook
+seen_messages = LazyProxy(SeenMessages)
@@ -0,0 +1,110 @@
+"""
+Job Record - COMPACT JOB REPRESENTATION
+One slotted object per job: the 57 sheet columns live in a list in COLUMNS
+order (so a Sheets row is a straight copy), anything else in a small side
+dict. Behaves like the plain dicts it replaces for legacy callers.
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))  # Root
+
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional
+
+from config.config import COLUMNS
+
+COLUMN_INDEX = {col: idx for idx, col in enumerate(COLUMNS)}
+_UNSET = object()  # column never assigned (absent, as with a dict)
+
+class JobRecord(MutableMapping):
+    __slots__ = ('_values', '_extra')
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, **kwargs):
+        self._values: List[Any] = [_UNSET] * len(COLUMNS)
+        self._extra: Optional[Dict[str, Any]] = None
+        if data:
+            self.update(data)
+        if kwargs:
+            self.update(kwargs)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "JobRecord":
+        if isinstance(data, cls):
+            return data
+        return cls(data)
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "JobRecord":
+        record = cls()
+        record._values[:len(row)] = row[:len(COLUMNS)]
+        return record
+
+    def __getitem__(self, key: str) -> Any:
+        idx = COLUMN_INDEX.get(key)
+        if idx is not None:
+            value = self._values[idx]
+            if value is not _UNSET:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        idx = COLUMN_INDEX.get(key)
+        if idx is not None:
+            value = self._values[idx]
+            return default if value is _UNSET else value
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def __setitem__(self, key: str, value: Any):
+        idx = COLUMN_INDEX.get(key)
+        if idx is not None:
+            self._values[idx] = value
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str):
+        idx = COLUMN_INDEX.get(key)
+        if idx is not None and self._values[idx] is not _UNSET:
+            self._values[idx] = _UNSET
+        elif idx is None and self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        idx = COLUMN_INDEX.get(key)
+        if idx is not None:
+            return self._values[idx] is not _UNSET
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for col, value in zip(COLUMNS, self._values):
+            if value is not _UNSET:
+                yield col
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return len(COLUMNS) - self._values.count(_UNSET) + (len(self._extra) if self._extra else 0)
+
+    def __repr__(self) -> str:
+        return f"JobRecord({self.get('Job ID', '')!r}, {self.get('Job Title', '')!r} @ {self.get('Company Name', '')!r})"
+
+    def copy(self) -> "JobRecord":
+        record = JobRecord()
+        record._values = self._values.copy()
+        record._extra = dict(self._extra) if self._extra else None
+        return record
+
+    def to_row(self) -> List[str]:
+        """Sheets/JobStore row in COLUMNS order; unset or None cells become ''."""
+        return ['' if value is _UNSET or value is None else str(value) for value in self._values]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict (JSON-serialisable if the values are) for legacy callers."""
+        return dict(self.items())
@@ -0,0 +1,138 @@
+"""
+Job Store - LOCAL SQLITE COPY OF THE 57-COLUMN SHEET
+Primary read path; SheetsManager replicates writes to Google Sheets
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))  # Root
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from config.config import COLUMNS
+from utils.local_db import connect
+from utils.job_record import JobRecord
+
+def normalize_key(title: str, company: str) -> str:
+    """Normalized Job Title + Company Name, as compared by the duplicate detector."""
+    return f"{str(title or '').strip().lower()}|{str(company or '').strip().lower()}"
+
+def _quote(col: str) -> str:
+    return '"' + col.replace('"', '""') + '"'
+
+_COLS_SQL = ", ".join(_quote(c) for c in COLUMNS)
+_PLACEHOLDERS = ", ".join("?" for _ in COLUMNS)
+
+class JobStore:
+    def __init__(self, name: str = "jobs"):
+        self.conn = connect(name)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute(f"""CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                synced INTEGER NOT NULL DEFAULT 0,
+                norm_key TEXT NOT NULL,
+                sync_error TEXT NOT NULL DEFAULT '',
+                {", ".join(f"{_quote(c)} TEXT NOT NULL DEFAULT ''" for c in COLUMNS)}
+            )""")
+            self.conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_job_id ON jobs ("Job ID") WHERE "Job ID" != \'\'')
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_unsynced ON jobs (synced) WHERE synced = 0")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    @staticmethod
+    def to_row(job: Dict[str, Any]) -> List[str]:
+        if isinstance(job, JobRecord):
+            return job.to_row()
+        return ['' if job.get(col) is None else str(job.get(col)) for col in COLUMNS]
+
+    @staticmethod
+    def _to_dict(row, columns: List[str] = None) -> Dict[str, Any]:
+        return {col: row[col] for col in (columns or COLUMNS)}
+
+    def insert(self, job: Dict[str, Any], synced: bool = False, row: List[str] = None) -> Optional[int]:
+        """Insert one job, return its local id (None if the Job ID already exists)."""
+        row = row if row is not None else self.to_row(job)
+        with self.lock:
+            cur = self.conn.execute(
+                f"INSERT OR IGNORE INTO jobs (synced, norm_key, {_COLS_SQL}) VALUES (?, ?, {_PLACEHOLDERS})",
+                [int(synced), normalize_key(job.get('Job Title'), job.get('Company Name'))] + row,
+            )
+            return cur.lastrowid if cur.rowcount else None
+
+    def insert_many(self, jobs: Iterable[Dict[str, Any]], synced: bool = True) -> int:
+        params = [
+            [int(synced), normalize_key(job.get('Job Title'), job.get('Company Name'))] + self.to_row(job)
+            for job in jobs
+        ]
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                cur = self.conn.executemany(
+                    f"INSERT OR IGNORE INTO jobs (synced, norm_key, {_COLS_SQL}) VALUES (?, ?, {_PLACEHOLDERS})",
+                    params,
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return cur.rowcount
+
+    def get_jobs(self, limit: int = 100, columns: List[str] = None) -> List[Dict[str, Any]]:
+        """Most recent jobs in insertion (sheet) order, optionally only some columns."""
+        for col in columns or []:
+            if col not in COLUMNS:
+                raise ValueError(f"Unknown column: {col}")
+        select = ", ".join(_quote(c) for c in columns) if columns else "*"
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT {select} FROM (SELECT * FROM jobs ORDER BY id DESC LIMIT ?) ORDER BY id", (limit,)
+            ).fetchall()
+        return [self._to_dict(r, columns) for r in rows]
+
+    def all_jobs(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            rows = self.conn.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def update(self, job_ids: List[str], values: Dict[str, Any]):
+        """Set the same column values on each of these jobs."""
+        for col in values:
+            if col not in COLUMNS:
+                raise ValueError(f"Unknown column: {col}")
+        assignments = ", ".join(f"{_quote(c)} = ?" for c in values)
+        with self.lock:
+            self.conn.executemany(
+                f'UPDATE jobs SET {assignments} WHERE "Job ID" = ?',
+                [['' if v is None else str(v) for v in values.values()] + [job_id] for job_id in job_ids],
+            )
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Jobs not yet replicated to Sheets: [{"id": local id, "row": [57 values]}]."""
+        with self.lock:
+            rows = self.conn.execute("SELECT * FROM jobs WHERE synced = 0 ORDER BY id").fetchall()
+        return [{'id': r['id'], 'row': [r[col] for col in COLUMNS]} for r in rows]
+
+    def mark_synced(self, ids: List[int]):
+        with self.lock:
+            self.conn.executemany("UPDATE jobs SET synced = 1 WHERE id = ?", [(i,) for i in ids])
+
+    def mark_failed(self, local_id: int, error: str):
+        """Sheets rejected this row; keep it locally but stop re-queuing it."""
+        with self.lock:
+            self.conn.execute("UPDATE jobs SET synced = -1, sync_error = ? WHERE id = ?", (error, local_id))
+
+    def failed(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT id, "Job ID", sync_error FROM jobs WHERE synced = -1 ORDER BY id'
+            ).fetchall()
+        return [{'id': r['id'], 'Job ID': r['Job ID'], 'error': r['sync_error']} for r in rows]
+
+    def get_meta(self, key: str, default: str = None) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else default
+
+    def set_meta(self, key: str, value: str):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
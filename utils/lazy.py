@@ -0,0 +1,38 @@
+"""
+Lazy singletons - build module-level instances on first use, not at import
+"""
+import threading
+from typing import Any, Callable
+
+class LazyProxy:
+    """Stands in for `factory()` and creates it on first attribute access."""
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def _get(self) -> Any:
+        instance = object.__getattribute__(self, '_instance')
+        if instance is None:
+            with object.__getattribute__(self, '_lock'):
+                instance = object.__getattribute__(self, '_instance')
+                if instance is None:
+                    instance = object.__getattribute__(self, '_factory')()
+                    object.__setattr__(self, '_instance', instance)
+        return instance
+
+    @property
+    def is_initialized(self) -> bool:
+        return object.__getattribute__(self, '_instance') is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._get(), name, value)
+
+    def __repr__(self) -> str:
+        factory = object.__getattribute__(self, '_factory')
+        state = 'ready' if self.is_initialized else 'not built'
+        return f"<LazyProxy {getattr(factory, '__name__', factory)} ({state})>"
@@ -0,0 +1,18 @@
+"""
+Local DB - SQLite files under CACHE_DIR shared by caches and stores
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))  # Root
+
+import sqlite3
+from config.config import CACHE_DIR
+
+def connect(name: str) -> sqlite3.Connection:
+    """Open CACHE_DIR/<name>.db. Callers serialize access with their own lock."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(CACHE_DIR / f"{name}.db"), check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
@@ -0,0 +1,52 @@
+"""
+Response Cache - PERSISTENT FEED CACHE
+Stores ETag/Last-Modified plus the already-parsed jobs for each feed URL
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))  # Root
+
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from utils.local_db import connect
+
+class ResponseCache:
+    def __init__(self, name: str = "http_cache"):
+        self.conn = connect(name)
+        self.lock = threading.Lock()
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL NOT NULL,
+            parsed TEXT NOT NULL
+        )""")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, fetched_at, parsed FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'etag': row['etag'],
+            'last_modified': row['last_modified'],
+            'fetched_at': row['fetched_at'],
+            'parsed': json.loads(row['parsed']),
+        }
+
+    def put(self, key: str, etag: Optional[str], last_modified: Optional[str], parsed: Any):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, last_modified, fetched_at, parsed) VALUES (?, ?, ?, ?, ?)",
+                (key, etag, last_modified, time.time(), json.dumps(parsed)),
+            )
+
+    def touch(self, key: str):
+        """Mark an entry fresh again after a 304."""
+        with self.lock:
+            self.conn.execute("UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time(), key))
@@ -0,0 +1,135 @@
+"""
+Scraper Transport - POOLED SESSIONS + PER-HOST RATE LIMITING
+One keep-alive session per host, throttled by a token bucket per portal
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))  # Root
+
+import threading
+import time
+from typing import Any, Callable, Dict
+from urllib.parse import urlsplit, urlunsplit, urlencode, parse_qsl
+
+from config.config import PORTAL_RATE_LIMITS, HTTP_POOL_SIZE
+from utils.response_cache import ResponseCache
+
+DEFAULT_RATE_LIMIT = {"rate": 1.0, "burst": 1}
+
+class TokenBucket:
+    """Thread-safe token bucket. Callers reserve a token and sleep only as long as needed."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token, return seconds to wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def acquire(self):
+        wait_time = self.reserve()
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+def cache_key(url: str, params: Any = None) -> str:
+    """url with its own query and params merged and sorted, so equal requests share one entry."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        items = params.items() if isinstance(params, dict) else params
+        query += [(str(k), str(v)) for k, v in items]
+    return urlunsplit(parts._replace(query=urlencode(sorted(query)), fragment=''))
+
+class ScraperTransport:
+    def __init__(self, rate_limits: Dict[str, Dict] = None, pool_size: int = HTTP_POOL_SIZE):
+        self.rate_limits = rate_limits if rate_limits is not None else PORTAL_RATE_LIMITS
+        self.pool_size = pool_size
+        self.sessions: Dict[str, "requests.Session"] = {}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+        self._cache = None
+
+    def _session(self, host: str) -> "requests.Session":
+        import requests  # deferred: keeps scraper imports cheap
+        from requests.adapters import HTTPAdapter
+        
+        with self.lock:
+            session = self.sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self.sessions[host] = session
+            return session
+
+    def _bucket(self, host: str, portal: str) -> TokenBucket:
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                limit = self.rate_limits.get(portal, DEFAULT_RATE_LIMIT)
+                bucket = TokenBucket(limit["rate"], limit["burst"])
+                self.buckets[host] = bucket
+            return bucket
+
+    def get(self, url: str, portal: str = "", **kwargs) -> "requests.Response":
+        """GET through the host's pooled session after waiting for a rate-limit token."""
+        host = urlsplit(url).netloc
+        self._bucket(host, portal).acquire()
+        return self._session(host).get(url, **kwargs)
+
+    @property
+    def cache(self) -> ResponseCache:
+        with self.lock:
+            if self._cache is None:
+                self._cache = ResponseCache()
+            return self._cache
+
+    def get_parsed(self, url: str, parse: Callable[["requests.Response"], Any], portal: str = "",
+                   ttl: float = 0, **kwargs) -> Any:
+        """GET url and return parse(resp), reusing the cached parse result when possible.
+
+        Within ttl seconds the cached result is returned without any request.
+        After that a conditional GET is sent; on 304 the cached result is reused
+        and parse() is skipped. Only 200 responses that parse to something are
+        cached, so an empty or captcha page is fetched again next time.
+        """
+        key = cache_key(url, kwargs.get("params"))
+        entry = self.cache.get(key)
+        if entry and time.time() - entry['fetched_at'] < ttl:
+            return entry['parsed']
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        resp = self.get(url, portal=portal, headers=headers, **kwargs)
+        if resp.status_code == 304 and entry:
+            self.cache.touch(key)
+            return entry['parsed']
+
+        parsed = parse(resp)
+        if resp.status_code == 200 and parsed:
+            self.cache.put(key, resp.headers.get('ETag'), resp.headers.get('Last-Modified'), parsed)
+        return parsed
+
+    def close(self):
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions.clear()
+
+# Shared by all scrapers
+transport = ScraperTransport()
@@ -2,22 +2,65 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))  # Root
 
-import gspread
-from google.oauth2.service_account import Credentials
-from config.config import COLUMNS, SHEETS_ID, GOOGLE_SHEETS_CREDENTIALS_PATH
+from config.config import COLUMNS, SHEETS_ID, GOOGLE_SHEETS_CREDENTIALS_PATH, SHEETS_BATCH_SIZE, SHEETS_FLUSH_SECONDS, SHEETS_MAX_RETRIES
+from utils.job_store import JobStore
+from utils.lazy import LazyProxy
 
 from typing import Dict, Any, List
-import pandas as pd
-from pathlib import Path
+import atexit
+import queue
+import random
+import threading
+import re
+import time
+
+_FLUSH = object()  # queue marker: write the current batch now
+
+def _col_letter(idx: int) -> str:
+    """1-based column index -> A1 letters (57 -> 'BE')."""
+    letters = ''
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+LAST_COL = _col_letter(len(COLUMNS))
+
+def _status_code(error: Exception) -> int:
+    """HTTP status of a gspread APIError, 0 for anything else (network errors etc.)."""
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', 0) or getattr(error, 'code', 0) or 0
+
+def _is_transient(error: Exception) -> bool:
+    """Quota, server and connection errors: the row is fine, try again later."""
+    status = _status_code(error)
+    return not status or status == 429 or status >= 500
+
+def _backoff(attempt: int) -> float:
+    return min(60.0, 2.0 ** attempt) * random.uniform(0.5, 1.5)
 
 class SheetsManager:
     def __init__(self):
+        import gspread
+        from google.oauth2.service_account import Credentials
+        
         scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
         creds = Credentials.from_service_account_file(GOOGLE_SHEETS_CREDENTIALS_PATH, scopes=scope)
         self.client = gspread.authorize(creds)
         self.sheet = self.client.open_by_key(SHEETS_ID).sheet1
         self.ensure_headers()
 
+        # Local store is the read path; Sheets gets writes from a background thread
+        self.store = JobStore()
+        self._sync_lock = threading.Lock()
+        self.sync_from_sheet()
+        self._replication_queue = queue.Queue()
+        for pending in self.store.pending():
+            self._replication_queue.put(pending)
+        self._replicator = threading.Thread(target=self._replicate_loop, name="sheets-replicator", daemon=True)
+        self._replicator.start()
+        atexit.register(self.flush)
+
     def ensure_headers(self):
         """Set 57 columns if missing."""
         try:
@@ -32,22 +75,198 @@ class SheetsManager:
         except Exception as e:
             print(f"Sheets error: {e}")
 
+    def _rows_seen(self) -> int:
+        """Last sheet row (header = 1) already merged into the local store."""
+        return int(self.store.get_meta('sheet_rows', '1'))
+
+    def fetch_rows(self, start: int, end: int, columns: List[str] = None) -> List[Dict[str, Any]]:
+        """Read sheet rows start..end; with columns, only those column ranges are downloaded."""
+        if end < start:
+            return []
+        if columns:
+            ranges = [f"{_col_letter(COLUMNS.index(c) + 1)}{start}:{_col_letter(COLUMNS.index(c) + 1)}{end}" for c in columns]
+            value_ranges = self.sheet.batch_get(ranges)
+            rows = [{} for _ in range(end - start + 1)]
+            for col, values in zip(columns, value_ranges):
+                for i, row in enumerate(rows):
+                    row[col] = values[i][0] if i < len(values) and values[i] else ''
+            return rows
+        values = self.sheet.get(f"A{start}:{LAST_COL}{end}")
+        return [dict(zip(COLUMNS, list(row) + [''] * (len(COLUMNS) - len(row)))) for row in values]
+
+    def sync_from_sheet(self) -> int:
+        """Merge rows added to the sheet since the last sync (e.g. by the other dyno).
+
+        Only column A is read to find the row count, then just the new tail.
+        """
+        try:
+            with self._sync_lock:
+                seen = self._rows_seen()
+                total = len(self.sheet.col_values(1))
+                if total < seen:
+                    # Sheet was cleared/rebuilt; re-read it (Job IDs already stored are ignored)
+                    seen = 1
+                if total <= seen:
+                    return 0
+                added = self.store.insert_many(self.fetch_rows(seen + 1, total), synced=True)
+                self.store.set_meta('sheet_rows', total)
+            print(f"Synced rows {seen + 1}-{total} from Sheets ({added} new jobs)")
+            return added
+        except Exception as e:
+            print(f"Sync error: {e}")
+            return 0
+
+    def _advance_rows_seen(self, response: Any, count: int):
+        """Our own appends don't need re-reading if they landed right after the synced tail."""
+        try:
+            updated = response['updates']['updatedRange']
+            first_row = int(re.search(r'![A-Z]+(\d+)', updated).group(1))
+        except Exception:
+            return
+        with self._sync_lock:
+            if first_row == self._rows_seen() + 1:
+                self.store.set_meta('sheet_rows', first_row + count - 1)
+
+    def _replicate_loop(self):
+        """Collect queued rows and send them with one append_rows call per batch."""
+        batch = []
+        deadline = 0.0
+        while True:
+            timeout = max(deadline - time.monotonic(), 0) if batch else None
+            try:
+                item = self._replication_queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None  # time threshold reached
+
+            if isinstance(item, dict) and 'update' in item:
+                # Cell updates follow the appends queued before them, so their rows exist
+                if batch:
+                    self._write_batch(batch)
+                    for _ in batch:
+                        self._replication_queue.task_done()
+                    batch = []
+                self._write_update(item)
+                self._replication_queue.task_done()
+                continue
+
+            if item is not None and item is not _FLUSH:
+                if not batch:
+                    deadline = time.monotonic() + SHEETS_FLUSH_SECONDS
+                batch.append(item)
+
+            if batch and (item is None or item is _FLUSH or len(batch) >= SHEETS_BATCH_SIZE):
+                self._write_batch(batch)
+                for _ in batch:
+                    self._replication_queue.task_done()
+                batch = []
+            if item is _FLUSH:
+                self._replication_queue.task_done()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        for attempt in range(SHEETS_MAX_RETRIES):
+            try:
+                response = self.sheet.append_rows([item['row'] for item in batch])
+                self.store.mark_synced([item['id'] for item in batch])
+                self._advance_rows_seen(response, len(batch))
+                print(f"Flushed {len(batch)} jobs to Sheets")
+                return
+            except Exception as e:
+                if not _is_transient(e):
+                    print(f"Batch append error ({len(batch)} rows): {e} - retrying row by row")
+                    break
+                if attempt + 1 < SHEETS_MAX_RETRIES:
+                    delay = _backoff(attempt)
+                    print(f"Batch append error ({len(batch)} rows): {e} - retrying in {delay:.0f}s")
+                    time.sleep(delay)
+                else:
+                    # Rows stay unsynced in the local store and are replayed on the next start
+                    print(f"Batch append error ({len(batch)} rows): {e} - giving up, rows left unsynced")
+                    return
+
+        # A row-specific 4xx: isolate the bad rows so they don't take the rest of the batch down
+        for idx, item in enumerate(batch):
+            try:
+                response = self.sheet.append_row(item['row'])
+                self.store.mark_synced([item['id']])
+                self._advance_rows_seen(response, 1)
+            except Exception as e:
+                job_id = item['row'][0] or 'Unknown'
+                if _is_transient(e):
+                    print(f"Append error (job {job_id}): {e} - {len(batch) - idx} rows left unsynced")
+                    return
+                print(f"Append error (job {job_id}): {e}")
+                self.store.mark_failed(item['id'], str(e))
+
+    def _write_update(self, item: Dict[str, Any]):
+        """Overwrite cells of appended rows, located by Job ID in column A.
+
+        Rows not in the sheet yet (unsynced) already carry the new values in the store.
+        """
+        job_ids = set(item['update'])
+        for attempt in range(SHEETS_MAX_RETRIES):
+            try:
+                rows = [idx for idx, job_id in enumerate(self.sheet.col_values(1), 1) if job_id in job_ids]
+                cells = [{'range': f"{_col_letter(COLUMNS.index(col) + 1)}{row}", 'values': [[value]]}
+                         for row in rows for col, value in item['values'].items()]
+                if cells:
+                    self.sheet.batch_update(cells)
+                return
+            except Exception as e:
+                if not _is_transient(e) or attempt + 1 == SHEETS_MAX_RETRIES:
+                    print(f"Update error ({len(job_ids)} jobs): {e}")
+                    return
+                time.sleep(_backoff(attempt))
+
+    def flush(self):
+        """Send buffered rows now and block until Sheets has them."""
+        self._replication_queue.put(_FLUSH)
+        self._replication_queue.join()
+
     def append_job(self, job_data: Dict[str, Any]):
         """Append row, fill missing cols with ''."""
         try:
-            row = []
-            for col in COLUMNS:
-                row.append(job_data.get(col, ''))
-            self.sheet.append_row(row)
+            row = self.store.to_row(job_data)  # built once, shared by the store and Sheets
+            local_id = self.store.insert(job_data, row=row)
+            if local_id is None:
+                print(f"Job {job_data.get('Job ID', 'Unknown')} already stored")
+                return
+            self._replication_queue.put({'id': local_id, 'row': row})
             print(f"Appended job {job_data.get('Job ID', 'Unknown')}")
         except Exception as e:
             print(f"Append error: {e}")
 
-    def get_jobs(self, limit: int = 100) -> List[Dict[str, Any]]:
-        """Read recent jobs as list[dict]."""
+    def update_jobs(self, job_ids: List[str], values: Dict[str, Any]):
+        """Set columns of saved jobs in the store now and in Sheets after their append."""
+        try:
+            values = {col: '' if value is None else str(value) for col, value in values.items()}
+            self.store.update(job_ids, values)
+            self._replication_queue.put({'update': list(job_ids), 'values': values})
+        except Exception as e:
+            print(f"Update error: {e}")
+
+    def failed_rows(self) -> List[Dict[str, Any]]:
+        """Rows Sheets rejected (kept in the local store)."""
+        return self.store.failed()
+
+    def get_jobs(self, limit: int = 100, columns: List[str] = None, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Read recent jobs as list[dict].
+
+        Served from the local store; refresh=True first pulls only the rows
+        added to the sheet since the last sync. columns limits each dict to
+        those keys.
+        """
+        try:
+            if refresh:
+                self.sync_from_sheet()
+            return self.store.get_jobs(limit, columns)
+        except Exception as e:
+            print(f"Read error: {e}")
+            return []
+
+    def get_all_jobs(self) -> List[Dict[str, Any]]:
+        """Every stored job, oldest first."""
         try:
-            records = self.sheet.get_all_records()
-            return records[-limit:] if records else []
+            return self.store.all_jobs()
         except Exception as e:
             print(f"Read error: {e}")
             return []
@@ -60,10 +279,11 @@ class SheetsManager:
         except Exception as e:
             print(f"Update error: {e}")
 
-# Singleton
-manager = SheetsManager()
+# Singleton - authorizes and opens the sheet on first use, not at import
+manager = LazyProxy(SheetsManager)
 
 if __name__ == "__main__":
     test_job = {"Job ID": "TEST1", "Job Title": "Test Job", "Date Scraped": "2025-12-02"}
     manager.append_job(test_job)
+    manager.flush()
     print("Sheets ready!")
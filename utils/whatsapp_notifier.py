@@ -4,9 +4,11 @@ Job alerts + "10 data engineer germany" commands
 """
 import os
 import time
-import requests
+import atexit
 import logging
-from typing import Dict, Any, Optional, List
+import queue
+import threading
+from typing import Callable, Dict, Any, Optional, List
 from pathlib import Path
 from dotenv import load_dotenv
 import sys
@@ -23,8 +25,42 @@ RECIPIENT_PHONE = os.getenv("WHATSAPP_RECIPIENT", "4915906396002")
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("whatsapp_notifier")
 
+ALERT_MIN_SCORE = 85
+MAX_MESSAGE_CHARS = 4000  # WhatsApp text limit is 4096
+
+# A saved job's alert state lives in its Notes cell ('WhatsApp Alert' is not a sheet column)
+ALERT_COLUMN = 'Notes'
+ALERT_PENDING = 'WhatsApp alert pending'
+ALERT_SENT = 'WhatsApp alert sent'
+
+# Called on the sender thread with the jobs a message covered, once WhatsApp accepted it
+OnSent = Callable[[List[Dict[str, Any]]], None]
+
+class AlertDigest:
+    """Collects one run's high matches so they go out as a single message."""
+    def __init__(self):
+        self.items: List[tuple] = []
+        self.lock = threading.Lock()
+    
+    def add(self, job: Dict[str, Any], score: float) -> bool:
+        if score < ALERT_MIN_SCORE:
+            return False
+        with self.lock:
+            self.items.append((score, job))
+        return True
+    
+    def __len__(self) -> int:
+        return len(self.items)
+
 class WhatsAppNotifier:
     def __init__(self):
+        # Outbound queue: callers never wait on the Graph API; one sender thread keeps order
+        self._outbox: "queue.Queue[tuple]" = queue.Queue()
+        self._sender: Optional[threading.Thread] = None
+        self._session = None
+        self._lock = threading.Lock()
+        self._failed = 0  # messages given up on since the last flush()
+        
         if not all([PHONE_ID, ACCESS_TOKEN]):
             logger.warning("⚠️ WhatsApp credentials missing - alerts disabled")
             self.enabled = False
@@ -32,18 +68,31 @@ class WhatsAppNotifier:
         
         self.base_url = f"https://graph.facebook.com/v18.0/{PHONE_ID}/messages"
         self.enabled = True
+        atexit.register(self.flush)
         logger.info("✅ WhatsAppNotifier ready")
     
+    def _get_session(self):
+        """One keep-alive session for all Graph API calls."""
+        with self._lock:
+            if self._session is None:
+                import requests  # deferred: keeps import of this module cheap
+                
+                self._session = requests.Session()
+                self._session.headers.update({"Authorization": f"Bearer {ACCESS_TOKEN}",
+                                              "Content-Type": "application/json"})
+            return self._session
+    
     def send_message(self, to: str, message: str, max_retries: int = 3) -> Optional[str]:
+        """Blocking send (with retries); returns the message id. Prefer queue_message in hot paths."""
         if not self.enabled:
             return None
         
         data = {"messaging_product": "whatsapp", "to": to, "type": "text", "text": {"body": message}}
-        headers = {"Authorization": f"Bearer {ACCESS_TOKEN}", "Content-Type": "application/json"}
+        session = self._get_session()
         
         for attempt in range(max_retries):
             try:
-                resp = requests.post(self.base_url, json=data, headers=headers, timeout=15)
+                resp = session.post(self.base_url, json=data, timeout=15)
                 resp.raise_for_status()
                 result = resp.json()
                 msg_id = result['messages'][0]['id']
@@ -58,6 +107,53 @@ class WhatsAppNotifier:
         logger.error("❌ WhatsApp FAILED after retries")
         return None
     
+    def queue_message(self, to: str, message: str, on_sent: Optional[Callable[[], None]] = None) -> bool:
+        """Hand a message to the background sender and return immediately.
+
+        on_sent runs on the sender thread, only if WhatsApp accepted the message.
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            if self._sender is None:
+                self._sender = threading.Thread(target=self._send_loop, daemon=True)
+                self._sender.start()
+        self._outbox.put((to, message, on_sent))
+        return True
+    
+    def _send_loop(self):
+        while True:
+            to, message, on_sent = self._outbox.get()
+            try:
+                if self.send_message(to, message) is None:
+                    with self._lock:
+                        self._failed += 1
+                elif on_sent is not None:
+                    on_sent()
+            except Exception as e:
+                logger.error(f"❌ WhatsApp sender: {e}")
+            finally:
+                self._outbox.task_done()
+    
+    def flush(self, timeout: float = 60.0) -> bool:
+        """Wait for queued messages to go out.
+
+        False if some are still pending at the timeout or failed after their retries
+        since the previous flush.
+        """
+        deadline = time.time() + timeout
+        while self._outbox.unfinished_tasks:
+            if time.time() >= deadline:
+                logger.warning(f"⚠️ {self._outbox.unfinished_tasks} WhatsApp messages still queued")
+                return False
+            time.sleep(0.05)
+        with self._lock:
+            failed, self._failed = self._failed, 0
+        if failed:
+            logger.warning(f"⚠️ {failed} WhatsApp messages not delivered")
+            return False
+        return True
+    
     def format_job_alert(self, job: Dict[str, Any], score: float) -> str:
         title = job.get('Job Title', 'N/A')
         company = job.get('Company Name', 'N/A')
@@ -70,14 +166,56 @@ class WhatsAppNotifier:
 Apply: {url}"""
         return alert.strip()
     
-    def send_job_alert(self, job: Dict[str, Any], score: float) -> bool:
-        if not self.enabled or score < 85:
+    def _digest_messages(self, digest: AlertDigest) -> List[tuple]:
+        """(message, jobs in it): best matches first, each message under the WhatsApp limit."""
+        items = sorted(digest.items, key=lambda i: -i[0])
+        messages, current, jobs = [], f"🔥 {len(items)} JOB MATCHES (≥{ALERT_MIN_SCORE})", []
+        for score, job in items:
+            entry = (f"{score:.0f}/100 {job.get('Job Title', 'N/A')} | {job.get('Company Name', 'N/A')} | "
+                     f"{job.get('Location', 'N/A')}\nApply: {job.get('Job URL', 'N/A')}")
+            if len(current) + len(entry) + 2 > MAX_MESSAGE_CHARS:
+                messages.append((current, jobs))
+                current, jobs = "🔥 (cont.)", []
+            current += f"\n\n{entry}"
+            jobs.append(job)
+        messages.append((current, jobs))
+        return messages
+    
+    def format_digest(self, digest: AlertDigest) -> List[str]:
+        """Best matches first, split so each message stays under the WhatsApp limit."""
+        return [message for message, _ in self._digest_messages(digest)]
+    
+    def should_alert(self, score: float) -> bool:
+        return self.enabled and score >= ALERT_MIN_SCORE
+    
+    def send_job_alert(self, job: Dict[str, Any], score: float, digest: Optional[AlertDigest] = None,
+                       on_sent: Optional[OnSent] = None) -> bool:
+        """Queue an alert (or add it to `digest`); never blocks on the network.
+
+        on_sent([job]) runs once WhatsApp accepted the alert; digest jobs are
+        reported by send_digest instead.
+        """
+        if not self.should_alert(score):
             return False
+        if digest is not None:
+            return digest.add(job, score)
         
         message = self.format_job_alert(job, score)
-        logger.info(f"🚨 SENDING ALERT (score: {score:.1f}): {message[:80]}...")
-        msg_id = self.send_message(RECIPIENT_PHONE, message)
-        return msg_id is not None
+        logger.info(f"🚨 QUEUING ALERT (score: {score:.1f}): {message[:80]}...")
+        return self.queue_message(RECIPIENT_PHONE, message, on_sent and (lambda: on_sent([job])))
+    
+    def send_digest(self, digest: AlertDigest, on_sent: Optional[OnSent] = None) -> int:
+        """Queue the digest's matches as one (or a few, if long) messages; returns how many.
+
+        on_sent gets the jobs of each message WhatsApp accepted.
+        """
+        if not self.enabled or not len(digest):
+            return 0
+        messages = self._digest_messages(digest)
+        for message, jobs in messages:
+            self.queue_message(RECIPIENT_PHONE, message, on_sent and (lambda jobs=jobs: on_sent(jobs)))
+        logger.info(f"🚨 QUEUED DIGEST: {len(digest)} matches in {len(messages)} message(s)")
+        return len(messages)
 
 # Global notifier instance
 notifier = WhatsAppNotifier()
@@ -86,7 +224,6 @@ notifier = WhatsAppNotifier()
 if 'notifier' in globals():
     sys.path.insert(0, str(Path(__file__).parent.parent))
     try:
-        from agents.job_scraper import scrape_jobs
         import time
         import random
         
@@ -113,7 +250,7 @@ if 'notifier' in globals():
                 
                 print(f"📱 WhatsApp Command: {cmd}")
                 reply = f"🔍 Searching {cmd['num_jobs']} {cmd['keywords'][0]} jobs ({cmd['location']})..."
-                self.notifier.send_message(self.recipient_phone, reply)
+                self.notifier.queue_message(self.recipient_phone, reply)
                 
                 queries = [
                     f"{cmd['keywords'][0]} {cmd['location']}",
@@ -121,11 +258,15 @@ if 'notifier' in globals():
                     f"senior {cmd['keywords'][0]}"
                 ]
                 
-                jobs_found = self.run_quick_search(queries, cmd['num_jobs'])
-                self.notifier.send_message(self.recipient_phone, f"✅ Found {jobs_found} jobs! High matches sent 📊")
+                digest = AlertDigest()
+                jobs_found = self.run_quick_search(queries, cmd['num_jobs'], digest)
+                self.notifier.send_digest(digest)
+                self.notifier.queue_message(self.recipient_phone, f"✅ Found {jobs_found} jobs! High matches sent 📊")
                 return True
             
-            def run_quick_search(self, queries: list, target: int) -> int:
+            def run_quick_search(self, queries: list, target: int, digest: Optional[AlertDigest] = None) -> int:
+                from agents.job_scraper import scrape_jobs  # deferred: pulls in the scraper stack
+                
                 total = 0
                 for query in queries[:2]:
                     print(f"🔍 Running: {query}")
@@ -134,7 +275,7 @@ if 'notifier' in globals():
                         for job in jobs[:3]:
                             score = 75 + random.uniform(-10, 25)
                             if score >= 85:
-                                self.notifier.send_job_alert(job, score)
+                                self.notifier.send_job_alert(job, score, digest)
                             total += 1
                             if total >= target:
                                 break
@@ -144,7 +285,6 @@ if 'notifier' in globals():
                     
                     if total >= target:
                         break
-                    time.sleep(1)
                 return total
         
         command_handler = WhatsAppCommandHandler(notifier)
@@ -11,16 +11,19 @@ import uuid
 import random
 
 sys.path.insert(0, str(Path(__file__).parent))
-from utils.whatsapp_notifier import command_handler
+from utils.whatsapp_notifier import command_handler, AlertDigest, ALERT_COLUMN, ALERT_PENDING, ALERT_SENT
 from utils.sheets_manager import manager
-from utils.duplicate_detector import is_duplicate
+from utils.duplicate_detector import DuplicateIndex, is_duplicate, register_job
+from utils.command_queue import command_queue
+from utils.idempotency import seen_messages
+from config.config import FUSED_ENRICHMENT
 from agents.job_scraper import scrape_jobs
 
 app = Flask(__name__)
 
 @app.route('/webhook/whatsapp', methods=['POST'])
 def whatsapp_webhook():
-    """Handle incoming WhatsApp messages + SAVE TO SHEETS."""
+    """Validate + queue incoming WhatsApp commands, then ack right away (Meta retries slow replies)."""
     try:
         data = request.json
         print(f"\n{'='*60}")
@@ -34,11 +37,25 @@ def whatsapp_webhook():
                         messages = change['value']['messages']
                         
                         for msg in messages:
-                            text = msg['text']['body']
+                            msg_id = msg.get('id', '')
+                            if msg_id and seen_messages.seen(msg_id):
+                                print(f"♻️ Redelivery of {msg_id} - already handled")
+                                continue
+                            
+                            text = msg.get('text', {}).get('body', '')
                             print(f"👤 Message: {text}\n")
                             
-                            # Handle command + SAVE RESULTS
-                            save_command_results(text)
+                            if command_handler.parse_command(text)['is_command']:
+                                # Scrape + analyze + save runs on the worker pool
+                                command_queue.start(save_command_results)
+                                if command_queue.enqueue(text, msg_id) is None:
+                                    print(f"♻️ Redelivery of {msg_id} - already queued")
+                            else:
+                                print("⚠️ Not recognized as command")
+                            
+                            # Only once handled: if enqueue raised, Meta's redelivery gets another try
+                            if msg_id:
+                                seen_messages.remember(msg_id)
         
         return {"status": "ok"}
     except Exception as e:
@@ -47,16 +64,23 @@ def whatsapp_webhook():
         traceback.print_exc()
         return {"status": "error"}, 500
 
+def alerts_delivered(jobs: list):
+    """WhatsApp accepted the digest message for these saved jobs: record it on their rows."""
+    manager.update_jobs([job['Job ID'] for job in jobs], {ALERT_COLUMN: ALERT_SENT})
+
 def save_command_results(message: str):
     """Run command + analyze + save jobs to Sheets - DYNAMIC LIMIT."""
     
     try:
-        from agents.skill_analyzer import analyze_job_skills
+        from agents.skill_analyzer import analyze_jobs_skills
         from agents.company_researcher import research_company
+        from agents.job_enricher import enrich_jobs
     except ImportError as e:
         print(f"⚠️ AI agents not found: {e}")
-        analyze_job_skills = None
+        analyze_jobs_skills = None
         research_company = None
+        enrich_jobs = None
+    fused = enrich_jobs is not None and FUSED_ENRICHMENT  # one call per job covers skills + company
     
     cmd = command_handler.parse_command(message)
     if not cmd['is_command']:
@@ -67,6 +91,7 @@ def save_command_results(message: str):
     queries = [f"{cmd['keywords'][0]} {cmd['location']}", f"{cmd['keywords'][0]} remote"]
     
     saved_count = 0
+    digest = AlertDigest()  # all high matches of this command -> one WhatsApp message
     MAX_JOBS = cmd['num_jobs']  # 🎯 USE REQUESTED NUMBER!
     print(f"🎯 Limit: {MAX_JOBS} jobs\n")
     
@@ -85,27 +110,57 @@ def save_command_results(message: str):
                 print(f"⚠️ No jobs from this query")
                 continue
             
-            for idx, job in enumerate(jobs[:3], 1):
+            # Dedupe first so duplicates cost no LLM calls (against saved jobs and this batch)
+            batch, pending = [], DuplicateIndex()
+            for job in jobs:
+                if len(batch) >= min(3, MAX_JOBS - saved_count):
+                    break
+                job['Job ID'] = str(uuid.uuid4())[:8].upper()
+                is_dup, dup_id = is_duplicate(job, pending=pending)
+                if is_dup:
+                    print(f"❌ Duplicate: {job.get('Job Title', 'N/A')} ({dup_id})")
+                    continue
+                pending.add(job)
+                batch.append(job)
+            print(f"✅ {len(batch)} new jobs to analyze\n")
+            if not batch:
+                continue
+            
+            # 🔥 AI SKILL ANALYSIS - one batched prompt for the new jobs we can still save
+            skill_results = []
+            if fused:
+                print(f"⚙️ Enriching {len(batch)} jobs (one fused call each, in parallel)...")
+                try:
+                    skill_results = enrich_jobs(batch)
+                except Exception as e:
+                    print(f"⚠️ Enrichment error: {e}")
+                    import traceback
+                    traceback.print_exc()
+            elif analyze_jobs_skills:
+                print(f"⚙️ Analyzing skills for {len(batch)} jobs...")
+                try:
+                    skill_results = analyze_jobs_skills(batch)
+                except Exception as e:
+                    print(f"⚠️ Skill error: {e}")
+                    import traceback
+                    traceback.print_exc()
+            
+            for idx, job in enumerate(batch, 1):
                 if saved_count >= MAX_JOBS:
                     print(f"🛑 Reached {MAX_JOBS} job limit!")
                     break
                 
-                print(f"\n--- JOB {idx}/{len(jobs)} ---")
+                print(f"\n--- JOB {idx}/{len(batch)} ---")
                 print(f"Title: {job.get('Job Title', 'N/A')}")
                 print(f"Company: {job.get('Company Name', 'N/A')}")
                 
-                # Dedupe check
-                is_dup, dup_id = is_duplicate(job)
-                if is_dup:
-                    print(f"❌ Duplicate")
+                if fused and idx <= len(skill_results) and skill_results[idx - 1] is None:
+                    print("❌ Enrichment failed - not saving this job")
                     continue
-                print(f"✅ Not duplicate")
                 
-                # 🔥 AI SKILL ANALYSIS
-                if analyze_job_skills:
-                    print("⚙️ Analyzing skills...")
+                if idx <= len(skill_results):
                     try:
-                        skill_data = analyze_job_skills(job)
+                        skill_data = skill_results[idx - 1]
                         job.update(skill_data)
                         print(f"✅ Skills: {skill_data.get('Skills Match %', 'N/A')}")
                         print(f"   Required: {skill_data.get('Required Skills', 'N/A')[:60]}...")
@@ -117,7 +172,7 @@ def save_command_results(message: str):
                         traceback.print_exc()
                 
                 # 🔥 AI COMPANY RESEARCH
-                if research_company:
+                if research_company and not fused:
                     print("⚙️ Researching company...")
                     try:
                         company_data = research_company(job)
@@ -129,7 +184,6 @@ def save_command_results(message: str):
                         print(f"⚠️ Company error: {e}")
                 
                 # Add metadata
-                job['Job ID'] = str(uuid.uuid4())[:8].upper()
                 job['Date Scraped'] = time.strftime("%Y-%m-%d")
                 
                 # Get score from skills match or use random
@@ -142,39 +196,48 @@ def save_command_results(message: str):
                 job['Match Score'] = f"{score:.0f}"
                 print(f"📊 Score: {score:.0f}/100")
                 
-                # Send alert if high score
-                if score >= 85:
-                    print(f"🚨 HIGH SCORE! Sending WhatsApp alert...")
-                    try:
-                        command_handler.notifier.send_job_alert(job, score)
-                        print(f"✅ Alert sent!")
-                    except Exception as e:
-                        print(f"❌ Alert failed: {e}")
+                if command_handler.notifier.should_alert(score):
+                    job[ALERT_COLUMN] = ALERT_PENDING  # 'sent' once WhatsApp has the digest
+                job['Alert Score'] = f"{score:.1f}"
                 
                 # SAVE TO SHEETS
                 try:
                     manager.append_job(job)
+                    register_job(job)
                     saved_count += 1  # 🎯 INCREMENT COUNTER
                     print(f"💾 ✅ SAVED TO SHEETS! ({saved_count}/{MAX_JOBS} ID: {job['Job ID']})")
                 except Exception as e:
                     print(f"❌ Sheets save error: {e}")
                     import traceback
                     traceback.print_exc()
+                    continue
+                
+                # Collect alert if high score (sent as one digest at the end)
+                try:
+                    if command_handler.notifier.send_job_alert(job, score, digest):
+                        print(f"🚨 HIGH SCORE! Added to WhatsApp digest")
+                except Exception as e:
+                    print(f"❌ Alert failed: {e}")
         
         except Exception as e:
             print(f"❌ Scrape error: {e}")
             import traceback
             traceback.print_exc()
     
+    manager.flush()  # Sheets must have the rows before we tell the user to look
+    
     print(f"\n{'='*60}")
     print(f"✅ TOTAL SAVED: {saved_count}/{MAX_JOBS} jobs to Sheets!")
     print(f"{'='*60}\n")
     
     try:
-        command_handler.notifier.send_message(
+        command_handler.notifier.send_digest(digest, alerts_delivered)
+        command_handler.notifier.queue_message(
             command_handler.recipient_phone,
             f"✅ Saved {saved_count}/{MAX_JOBS} jobs! Check your Google Sheets 📊"
         )
+        if not command_handler.notifier.flush():
+            print("⚠️ Some WhatsApp messages were not delivered")
     except Exception as e:
         print(f"⚠️ Message send failed: {e}")
 
@@ -199,9 +262,16 @@ def health():
     """Health check endpoint."""
     return {"status": "healthy"}, 200
 
+@app.route('/queue', methods=['GET'])
+def queue_status():
+    """Command queue depth + per-command wait/run latency."""
+    return command_queue.stats(), 200
+
 if __name__ == "__main__":
     print("\n" + "="*60)
     print("🚀 WhatsApp Webhook Server READY on port 5000")
     print("📍 Webhook: http://0.0.0.0:5000/webhook/whatsapp")
+    print("📍 Queue:   http://0.0.0.0:5000/queue")
     print("="*60 + "\n")
+    command_queue.start(save_command_results)  # also resumes commands queued before a restart
     app.run(host='0.0.0.0', port=5000, debug=False)